@@ -3,17 +3,320 @@ Advanced Self-Learning System
 Incorporating improvements from recent research papers
 """
 
+import atexit
+import hashlib
 import json
+import math
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
+import time
+import uuid
+import weakref
 from collections import defaultdict
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
-import joblib
+from dataclasses import asdict, dataclass, field
+from operator import methodcaller
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        def decorator(func):
+            return func
+        return decorator
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Shared, interned feature-name keys for the per-attack feature dicts
+_SYSTEM_FEATURE_KEYS = tuple(map(sys.intern, ('cpu_usage', 'memory_usage', 'disk_usage')))
+_PROCESS_FEATURE_KEYS = tuple(map(sys.intern, ('process_count', 'suspicious_process_count')))
+_NETWORK_FEATURE_KEYS = tuple(map(sys.intern, ('total_events', 'foreign_connections', 'unique_ports')))
+
+# C-level accessor for the per-process suspicious flag (avoids genexpr frames)
+_IS_SUSPICIOUS = methodcaller('get', 'is_suspicious', False)
+
+# Bit flags returned by the behavioral scoring kernels
+_HIGH_RESOURCE_USAGE = 1
+_RESOURCE_SPIKE = 2
+_RESOURCE_ANOMALY = 4
+_HIGH_NETWORK_ACTIVITY = 1
+_SUSPICIOUS_CONNECTIONS = 2
+_NETWORK_ANOMALY = 4
+
+
+@njit(cache=True)
+def _cyclical(hour, weekday):
+    """Cyclical (sin, cos) encoding of hour-of-day and day-of-week"""
+    hour_angle = 2.0 * math.pi * hour / 24.0
+    day_angle = 2.0 * math.pi * weekday / 7.0
+    return math.sin(hour_angle), math.cos(hour_angle), math.sin(day_angle), math.cos(day_angle)
+
+
+@njit(cache=True)
+def _resource_flags(cpu, memory):
+    """Resource usage behavior flags as a bitmask"""
+    flags = 0
+    if cpu > 80 or memory > 80:
+        flags |= _HIGH_RESOURCE_USAGE
+    if cpu > 90 or memory > 90:
+        flags |= _RESOURCE_SPIKE
+    if abs(cpu - memory) > 50:
+        flags |= _RESOURCE_ANOMALY
+    return flags
+
+
+@njit(cache=True)
+def _network_flags(total_events, foreign_connections):
+    """Network behavior flags as a bitmask"""
+    flags = 0
+    if total_events > 100:
+        flags |= _HIGH_NETWORK_ACTIVITY
+    if foreign_connections > 10:
+        flags |= _SUSPICIOUS_CONNECTIONS
+    if foreign_connections / max(total_events, 1) > 0.5:
+        flags |= _NETWORK_ANOMALY
+    return flags
+
+
+# Columnar signature storage: signatures buffered per Parquet row group, and
+# each file finished (footer written) after this many row groups or seconds
+_PARQUET_BATCH_SIZE = 64
+_PARQUET_FILE_BATCHES = 16
+_PARQUET_FILE_SECONDS = 300.0
+_SIGNATURE_SECTIONS = (
+    'features', 'behavioral_patterns', 'temporal_patterns',
+    'attention_weights', 'transfer_learning_info', 'proactive_indicators'
+)
+
+if PYARROW_AVAILABLE:
+    _SIGNATURE_SCHEMA = pa.schema(
+        [('id', pa.string()), ('timestamp', pa.string()),
+         ('threat_level', pa.string()), ('confidence', pa.float64())] +
+        [(section, pa.string()) for section in _SIGNATURE_SECTIONS]
+    )
+
+
+def _flatten_signature(signature: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a signature into a fixed-schema row (nested sections as JSON)"""
+    row = {
+        'id': signature.get('id'),
+        'timestamp': signature.get('timestamp'),
+        'threat_level': signature.get('threat_level'),
+        'confidence': float(signature.get('confidence', 0))
+    }
+    for section in _SIGNATURE_SECTIONS:
+        row[section] = json.dumps(signature.get(section, {}), default=str)
+    return row
+
+
+def _content_digest(obj: Any) -> str:
+    """Stable 64-bit hex digest of a JSON-serializable object"""
+    canonical = json.dumps(obj, sort_keys=True, default=str).encode('utf-8')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64(canonical).hexdigest()
+    return hashlib.blake2b(canonical, digest_size=8).hexdigest()
+
+
+class _LearningDataWriter:
+    """
+    Background writer for learning data: JSON files, and signatures as
+    Parquet files under signatures/. The thread only references the writer,
+    so an unreferenced learning system can still be collected
+    """
+    
+    def __init__(self, learning_path: str, logger: logging.Logger):
+        self._logger = logger
+        
+        # pyarrow imports pandas (when installed) the first time it builds a
+        # table; do it now, since the last signatures are written at interpreter
+        # exit, where importing fails
+        if PYARROW_AVAILABLE:
+            try:
+                import pandas  # noqa: F401
+            except ImportError:
+                pass
+        
+        # Parquet files: unique per writer (pid + uuid), numbered as they roll.
+        # Written as .part and renamed once the footer is on disk
+        self._signature_rows = []
+        self._parquet_prefix = (
+            f"{learning_path}/signatures/signatures_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            f"_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        )
+        self._parquet_seq = 0
+        self._parquet_writer = None
+        self._parquet_batches = 0
+        self._parquet_opened = 0.0
+        
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def write_file(self, path: str, text: str):
+        """Queue a text file write"""
+        self._queue.put((path, text))
+    
+    def add_signature(self, row: Dict[str, Any]):
+        """Buffer a flattened signature row; full buffers go out as one row group"""
+        self._signature_rows.append(row)
+        if len(self._signature_rows) >= _PARQUET_BATCH_SIZE:
+            self._queue_signature_batch()
+    
+    def close(self):
+        """Write everything buffered or queued, finish the Parquet file and stop"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._signature_rows:
+            self._queue_signature_batch()
+        self._queue.put(None)
+        self._thread.join()
+    
+    def _queue_signature_batch(self):
+        """Hand buffered signature rows to the writer thread as one row group"""
+        rows, self._signature_rows = self._signature_rows, []
+        self._queue.put((None, rows))
+    
+    def _run(self):
+        """Write queued (path, payload) items until the stop sentinel arrives"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, payload = item
+            try:
+                if path is None:
+                    self._write_signature_batch(payload)
+                else:
+                    with open(path, 'w') as f:
+                        f.write(payload)
+            except Exception as e:
+                self._logger.error("Error writing learning data to %s: %s", path or self._parquet_prefix, e)
+        
+        try:
+            self._finish_parquet_file()
+        except Exception as e:
+            self._logger.error("Error finishing signature file: %s", e)
+    
+    def _write_signature_batch(self, rows: List[Dict[str, Any]]):
+        """Append rows as a row group, rolling to a new file when the current one is full or old"""
+        table = pa.Table.from_pydict(
+            {name: [row[name] for row in rows] for name in _SIGNATURE_SCHEMA.names},
+            schema=_SIGNATURE_SCHEMA
+        )
+        if self._parquet_writer is None:
+            path = f"{self._parquet_prefix}_{self._parquet_seq:04d}.parquet.part"
+            self._parquet_writer = pq.ParquetWriter(path, _SIGNATURE_SCHEMA, compression='zstd')
+            self._parquet_batches = 0
+            self._parquet_opened = time.monotonic()
+        
+        self._parquet_writer.write_table(table)
+        self._parquet_batches += 1
+        
+        if (self._parquet_batches >= _PARQUET_FILE_BATCHES
+                or time.monotonic() - self._parquet_opened >= _PARQUET_FILE_SECONDS):
+            self._finish_parquet_file()
+    
+    def _finish_parquet_file(self):
+        """Write the footer of the open Parquet file and publish it under its final name"""
+        if self._parquet_writer is None:
+            return
+        writer, self._parquet_writer = self._parquet_writer, None
+        writer.close()
+        path = f"{self._parquet_prefix}_{self._parquet_seq:04d}.parquet"
+        os.replace(f"{path}.part", path)
+        self._parquet_seq += 1
+
+
+@dataclass(slots=True)
+class AttackPattern:
+    """Attack pattern extracted for learning"""
+    timestamp: str
+    threat_level: str = 'MEDIUM'
+    validation_score: float = 0
+    features: Dict[str, Any] = field(default_factory=dict)
+    temporal_patterns: Dict[str, Any] = field(default_factory=dict)
+    behavioral_patterns: Dict[str, Any] = field(default_factory=dict)
+    attention_weights: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class AttackView:
+    """Normalized view of the attack_data fields read by the learning helpers"""
+    threat_level: str = 'MEDIUM'
+    validation_score: float = 0
+    has_host: bool = False
+    has_system: bool = False
+    cpu: float = 0
+    memory: float = 0
+    disk: float = 0
+    processes: Optional[List[Dict[str, Any]]] = None
+    suspicious_processes: List[Dict[str, Any]] = field(default_factory=list)
+    network_features: Optional[Dict[str, Any]] = None
+    total_events: float = 0
+    foreign_connections: float = 0
+    unique_ports: int = 0
+    suspicious_patterns: int = 0
+    anomaly_score: float = 0
+
+
+def _normalize(attack_data: Dict[str, Any]) -> AttackView:
+    """Read the host and network metrics of an attack once"""
+    view = AttackView(
+        threat_level=attack_data.get('threat_level', 'MEDIUM'),
+        validation_score=attack_data.get('validation_score', 0),
+        has_host='host_metrics' in attack_data
+    )
+    
+    if view.has_host:
+        host_metrics = attack_data['host_metrics']
+        
+        if 'system' in host_metrics:
+            system = host_metrics['system']
+            view.has_system = True
+            view.cpu = system.get('cpu', {}).get('percent', 0)
+            view.memory = system.get('memory', {}).get('percent', 0)
+            view.disk = system.get('disk', {}).get('percent', 0)
+        
+        if 'processes' in host_metrics:
+            view.processes = host_metrics['processes']
+            view.suspicious_processes = list(filter(_IS_SUSPICIOUS, view.processes))
+    
+    if 'network_metrics' in attack_data and 'features' in attack_data['network_metrics']:
+        features = attack_data['network_metrics']['features']
+        view.network_features = features
+        view.total_events = features.get('total_events', 0)
+        view.foreign_connections = features.get('foreign_connections', 0)
+        view.unique_ports = len(features.get('unique_ports', []))
+        view.suspicious_patterns = len(features.get('suspicious_patterns', []))
+        view.anomaly_score = features.get('anomaly_score', 0)
+    
+    return view
+
 
 class AdvancedSelfLearningSystem:
     """
@@ -24,6 +327,9 @@ class AdvancedSelfLearningSystem:
     - Attention fusion for pattern recognition
     """
     
+    # Learning paths whose directory tree has already been provisioned
+    _INIT_DIRS = set()
+    
     def __init__(self, learning_path: str = "learning_data/"):
         self.learning_path = learning_path
         self.logger = self._setup_logger()
@@ -50,136 +356,160 @@ class AdvancedSelfLearningSystem:
         self.attention_weights = {}
         self.pattern_attention = {}
         
-        # Create learning directories
-        os.makedirs(learning_path, exist_ok=True)
-        os.makedirs(f"{learning_path}/patterns", exist_ok=True)
-        os.makedirs(f"{learning_path}/signatures", exist_ok=True)
-        os.makedirs(f"{learning_path}/predictions", exist_ok=True)
-        os.makedirs(f"{learning_path}/proactive", exist_ok=True)
+        # Create learning directories (once per learning path)
+        if learning_path not in AdvancedSelfLearningSystem._INIT_DIRS:
+            os.makedirs(learning_path, exist_ok=True)
+            os.makedirs(f"{learning_path}/patterns", exist_ok=True)
+            os.makedirs(f"{learning_path}/signatures", exist_ok=True)
+            os.makedirs(f"{learning_path}/predictions", exist_ok=True)
+            os.makedirs(f"{learning_path}/proactive", exist_ok=True)
+            AdvancedSelfLearningSystem._INIT_DIRS.add(learning_path)
+        
+        # Background writer so learning data hits disk off the learning path.
+        # Closed by close(), when the system is collected, or at exit
+        self._writer = _LearningDataWriter(learning_path, self.logger)
+        self._close_writer = weakref.finalize(self, self._writer.close)
+    
+    @property
+    def attention_weights(self) -> Dict[str, float]:
+        """Attention weight per feature (a new dict built from the weight array)"""
+        return dict(zip(self._attention_names, self._attention_arr.tolist()))
+    
+    @attention_weights.setter
+    def attention_weights(self, weights: Dict[str, float]):
+        # The array is the source of truth, so updates scale it in place
+        self._attention_names = tuple(weights)
+        self._attention_index = {name: i for i, name in enumerate(self._attention_names)}
+        self._attention_arr = np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+    
+    def _attention_weight(self, feature_name: str, default: float = 1.0) -> float:
+        """Attention weight of one feature without building the dict"""
+        index = self._attention_index.get(feature_name)
+        return default if index is None else float(self._attention_arr[index])
     
     def _setup_logger(self) -> logging.Logger:
         """Setup logger for advanced self-learning system"""
         logger = logging.getLogger('AdvancedSelfLearningSystem')
         logger.setLevel(logging.INFO)
         
-        handler = logging.FileHandler('logs/advanced_self_learning.log')
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        if not logger.handlers:
+            handler = logging.FileHandler('logs/advanced_self_learning.log')
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            handler.setFormatter(formatter)
+            
+            # File writes happen on the listener thread, off the learning path
+            log_queue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(log_queue, handler)
+            listener.start()
+            atexit.register(listener.stop)
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
         
         return logger
     
+    def close(self):
+        """Write all pending learning data and finish the signature file"""
+        self._close_writer()
+    
     def learn_from_attack(self, attack_data: Dict[str, Any]) -> bool:
         """
         Advanced learning from attack with multiple improvements
         """
         try:
-            self.logger.info("Starting advanced learning from attack...")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Starting advanced learning from attack...")
+            
+            view = _normalize(attack_data)
             
             # 1. Extract attack pattern with attention fusion
-            attack_pattern = self._extract_advanced_attack_pattern(attack_data)
+            attack_pattern = self._extract_advanced_attack_pattern(view)
             
             # 2. Update feature importance with attention weights
-            self._update_advanced_feature_importance(attack_data)
+            self._update_advanced_feature_importance(view)
             
             # 3. Generate signature with transfer learning
-            new_signature = self._generate_advanced_signature(attack_pattern, attack_data)
+            new_signature = self._generate_advanced_signature(attack_pattern, view)
             
             # 4. Proactive healing analysis
-            self._analyze_proactive_healing_opportunities(attack_data)
+            self._analyze_proactive_healing_opportunities(view)
             
             # 5. Predictive maintenance update
-            self._update_predictive_maintenance(attack_data)
+            self._update_predictive_maintenance(view)
             
             # 6. Transfer learning update
             if self.transfer_learning_enabled:
                 self._update_transfer_learning(attack_data)
             
             # 7. Save advanced learning data
-            self._save_advanced_learning_data(attack_pattern, new_signature, attack_data)
+            self._save_advanced_learning_data(attack_pattern, new_signature)
             
             # 8. Update ML models with new knowledge
-            self._update_advanced_ml_models(attack_data)
+            self._update_advanced_ml_models(view)
             
-            self.logger.info("Advanced learning completed successfully")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Advanced learning completed successfully")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error in advanced self-learning: {e}")
+            self.logger.error("Error in advanced self-learning: %s", e)
             return False
     
-    def _extract_advanced_attack_pattern(self, attack_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _extract_advanced_attack_pattern(self, view: AttackView) -> AttackPattern:
         """
         Extract attack pattern with attention fusion and temporal analysis
         """
         try:
-            pattern = {
-                'timestamp': datetime.now().isoformat(),
-                'threat_level': attack_data.get('threat_level', 'MEDIUM'),
-                'validation_score': attack_data.get('validation_score', 0),
-                'features': {},
-                'temporal_patterns': {},
-                'behavioral_patterns': {},
-                'attention_weights': {}
-            }
+            pattern = AttackPattern(
+                timestamp=datetime.now().isoformat(),
+                threat_level=view.threat_level,
+                validation_score=view.validation_score
+            )
+            
+            # System resource patterns
+            if view.has_system:
+                pattern.features.update(zip(_SYSTEM_FEATURE_KEYS, (view.cpu, view.memory, view.disk)))
             
-            # Extract host-based patterns
-            if 'host_metrics' in attack_data:
-                host_metrics = attack_data['host_metrics']
+            # Process patterns with attention
+            if view.processes is not None:
+                processes = view.processes
+                suspicious_processes = view.suspicious_processes
                 
-                # System resource patterns
-                if 'system' in host_metrics:
-                    system = host_metrics['system']
-                    pattern['features']['cpu_usage'] = system.get('cpu', {}).get('percent', 0)
-                    pattern['features']['memory_usage'] = system.get('memory', {}).get('percent', 0)
-                    pattern['features']['disk_usage'] = system.get('disk', {}).get('percent', 0)
+                pattern.behavioral_patterns['suspicious_process_count'] = len(suspicious_processes)
+                pattern.behavioral_patterns['total_process_count'] = len(processes)
+                pattern.behavioral_patterns['suspicious_ratio'] = len(suspicious_processes) / max(len(processes), 1)
                 
-                # Process patterns with attention
-                if 'processes' in host_metrics:
-                    processes = host_metrics['processes']
-                    suspicious_processes = [p for p in processes if p.get('is_suspicious', False)]
-                    
-                    pattern['behavioral_patterns']['suspicious_process_count'] = len(suspicious_processes)
-                    pattern['behavioral_patterns']['total_process_count'] = len(processes)
-                    pattern['behavioral_patterns']['suspicious_ratio'] = len(suspicious_processes) / max(len(processes), 1)
+                # Process attention weights
+                if suspicious_processes:
+                    cpu_weights = [p.get('cpu_percent', 0) for p in suspicious_processes]
+                    memory_weights = [p.get('memory_percent', 0) for p in suspicious_processes]
                     
-                    # Process attention weights
-                    if suspicious_processes:
-                        cpu_weights = [p.get('cpu_percent', 0) for p in suspicious_processes]
-                        memory_weights = [p.get('memory_percent', 0) for p in suspicious_processes]
-                        
-                        pattern['attention_weights']['cpu_attention'] = np.mean(cpu_weights)
-                        pattern['attention_weights']['memory_attention'] = np.mean(memory_weights)
+                    pattern.attention_weights['cpu_attention'] = np.mean(cpu_weights)
+                    pattern.attention_weights['memory_attention'] = np.mean(memory_weights)
             
             # Extract network patterns
-            if 'network_metrics' in attack_data:
-                network_metrics = attack_data['network_metrics']
+            if view.network_features is not None:
+                pattern.features['total_events'] = view.total_events
+                pattern.features['foreign_connections'] = view.foreign_connections
+                pattern.features['unique_ports'] = view.unique_ports
+                pattern.features['suspicious_patterns'] = view.suspicious_patterns
                 
-                if 'features' in network_metrics:
-                    features = network_metrics['features']
-                    pattern['features']['total_events'] = features.get('total_events', 0)
-                    pattern['features']['foreign_connections'] = features.get('foreign_connections', 0)
-                    pattern['features']['unique_ports'] = len(features.get('unique_ports', []))
-                    pattern['features']['suspicious_patterns'] = len(features.get('suspicious_patterns', []))
-                    
-                    # Network attention weights
-                    pattern['attention_weights']['network_attention'] = features.get('anomaly_score', 0) / 100
+                # Network attention weights
+                pattern.attention_weights['network_attention'] = view.anomaly_score / 100
             
             # Temporal pattern analysis
-            pattern['temporal_patterns'] = self._analyze_temporal_patterns(attack_data)
+            pattern.temporal_patterns = self._analyze_temporal_patterns(view)
             
             # Behavioral pattern analysis
-            pattern['behavioral_patterns'].update(self._analyze_behavioral_patterns(attack_data))
+            pattern.behavioral_patterns.update(self._analyze_behavioral_patterns(view))
             
             return pattern
             
         except Exception as e:
-            self.logger.error(f"Error extracting advanced attack pattern: {e}")
-            return {}
+            self.logger.error("Error extracting advanced attack pattern: %s", e)
+            return AttackPattern(timestamp=datetime.now().isoformat())
     
-    def _analyze_temporal_patterns(self, attack_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_temporal_patterns(self, view: AttackView) -> Dict[str, Any]:
         """Analyze temporal patterns in the attack"""
         temporal_patterns = {}
         
@@ -190,44 +520,39 @@ class AdvancedSelfLearningSystem:
         temporal_patterns['is_business_hours'] = 9 <= current_time.hour <= 17
         
         # Cyclical encoding
-        temporal_patterns['hour_sin'] = np.sin(2 * np.pi * current_time.hour / 24)
-        temporal_patterns['hour_cos'] = np.cos(2 * np.pi * current_time.hour / 24)
-        temporal_patterns['day_sin'] = np.sin(2 * np.pi * current_time.weekday() / 7)
-        temporal_patterns['day_cos'] = np.cos(2 * np.pi * current_time.weekday() / 7)
+        (temporal_patterns['hour_sin'], temporal_patterns['hour_cos'],
+         temporal_patterns['day_sin'], temporal_patterns['day_cos']) = _cyclical(
+            current_time.hour, current_time.weekday())
         
         return temporal_patterns
     
-    def _analyze_behavioral_patterns(self, attack_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_behavioral_patterns(self, view: AttackView) -> Dict[str, Any]:
         """Analyze behavioral patterns in the attack"""
         behavioral_patterns = {}
         
         # Resource usage patterns
-        if 'host_metrics' in attack_data and 'system' in attack_data['host_metrics']:
-            system = attack_data['host_metrics']['system']
-            cpu = system.get('cpu', {}).get('percent', 0)
-            memory = system.get('memory', {}).get('percent', 0)
+        if view.has_system:
+            flags = _resource_flags(view.cpu, view.memory)
             
-            behavioral_patterns['high_resource_usage'] = cpu > 80 or memory > 80
-            behavioral_patterns['resource_spike'] = cpu > 90 or memory > 90
-            behavioral_patterns['resource_anomaly'] = abs(cpu - memory) > 50
+            behavioral_patterns['high_resource_usage'] = bool(flags & _HIGH_RESOURCE_USAGE)
+            behavioral_patterns['resource_spike'] = bool(flags & _RESOURCE_SPIKE)
+            behavioral_patterns['resource_anomaly'] = bool(flags & _RESOURCE_ANOMALY)
         
         # Network behavior patterns
-        if 'network_metrics' in attack_data and 'features' in attack_data['network_metrics']:
-            features = attack_data['network_metrics']['features']
-            total_events = features.get('total_events', 0)
-            foreign_connections = features.get('foreign_connections', 0)
+        if view.network_features is not None:
+            flags = _network_flags(view.total_events, view.foreign_connections)
             
-            behavioral_patterns['high_network_activity'] = total_events > 100
-            behavioral_patterns['suspicious_connections'] = foreign_connections > 10
-            behavioral_patterns['network_anomaly'] = foreign_connections / max(total_events, 1) > 0.5
+            behavioral_patterns['high_network_activity'] = bool(flags & _HIGH_NETWORK_ACTIVITY)
+            behavioral_patterns['suspicious_connections'] = bool(flags & _SUSPICIOUS_CONNECTIONS)
+            behavioral_patterns['network_anomaly'] = bool(flags & _NETWORK_ANOMALY)
         
         return behavioral_patterns
     
-    def _update_advanced_feature_importance(self, attack_data: Dict[str, Any]):
+    def _update_advanced_feature_importance(self, view: AttackView):
         """Update feature importance with attention mechanisms"""
         try:
             # Extract features from attack data
-            features = self._extract_features_from_attack(attack_data)
+            features = self._extract_features_from_attack(view)
             
             # Update feature importance with attention weights
             for feature_name, value in features.items():
@@ -235,7 +560,7 @@ class AdvancedSelfLearningSystem:
                     self.feature_importance[feature_name] = 0.0
                 
                 # Update with attention-weighted importance
-                attention_weight = self.attention_weights.get(feature_name, 1.0)
+                attention_weight = self._attention_weight(feature_name)
                 self.feature_importance[feature_name] = (
                     0.7 * self.feature_importance[feature_name] + 
                     0.3 * (value * attention_weight)
@@ -248,54 +573,45 @@ class AdvancedSelfLearningSystem:
                     self.feature_importance[feature] /= total_importance
             
         except Exception as e:
-            self.logger.error(f"Error updating advanced feature importance: {e}")
+            self.logger.error("Error updating advanced feature importance: %s", e)
     
-    def _extract_features_from_attack(self, attack_data: Dict[str, Any]) -> Dict[str, float]:
+    def _extract_features_from_attack(self, view: AttackView) -> Dict[str, float]:
         """Extract features from attack data for importance calculation"""
         features = {}
         
         # Host metrics features
-        if 'host_metrics' in attack_data:
-            host_metrics = attack_data['host_metrics']
-            
-            if 'system' in host_metrics:
-                system = host_metrics['system']
-                features['cpu_usage'] = system.get('cpu', {}).get('percent', 0)
-                features['memory_usage'] = system.get('memory', {}).get('percent', 0)
-                features['disk_usage'] = system.get('disk', {}).get('percent', 0)
-            
-            if 'processes' in host_metrics:
-                processes = host_metrics['processes']
-                features['process_count'] = len(processes)
-                features['suspicious_process_count'] = sum(1 for p in processes if p.get('is_suspicious', False))
+        if view.has_system:
+            features.update(zip(_SYSTEM_FEATURE_KEYS, (view.cpu, view.memory, view.disk)))
+        
+        if view.processes is not None:
+            features.update(zip(_PROCESS_FEATURE_KEYS, (
+                len(view.processes), len(view.suspicious_processes)
+            )))
         
         # Network metrics features
-        if 'network_metrics' in attack_data:
-            network_metrics = attack_data['network_metrics']
-            
-            if 'features' in network_metrics:
-                network_features = network_metrics['features']
-                features['total_events'] = network_features.get('total_events', 0)
-                features['foreign_connections'] = network_features.get('foreign_connections', 0)
-                features['unique_ports'] = len(network_features.get('unique_ports', []))
+        if view.network_features is not None:
+            features.update(zip(_NETWORK_FEATURE_KEYS, (
+                view.total_events, view.foreign_connections, view.unique_ports
+            )))
         
         return features
     
-    def _generate_advanced_signature(self, attack_pattern: Dict[str, Any], 
-                                   attack_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_advanced_signature(self, attack_pattern: AttackPattern, 
+                                   view: AttackView) -> Dict[str, Any]:
         """
         Generate advanced signature with transfer learning and attention fusion
         """
         try:
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             signature = {
-                'id': f"sig_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                'id': f"sig_{stamp}_{_content_digest(asdict(attack_pattern))}",
                 'timestamp': datetime.now().isoformat(),
-                'threat_level': attack_pattern.get('threat_level', 'MEDIUM'),
-                'confidence': attack_pattern.get('validation_score', 0),
-                'features': attack_pattern.get('features', {}),
-                'behavioral_patterns': attack_pattern.get('behavioral_patterns', {}),
-                'temporal_patterns': attack_pattern.get('temporal_patterns', {}),
-                'attention_weights': attack_pattern.get('attention_weights', {}),
+                'threat_level': attack_pattern.threat_level,
+                'confidence': attack_pattern.validation_score,
+                'features': attack_pattern.features,
+                'behavioral_patterns': attack_pattern.behavioral_patterns,
+                'temporal_patterns': attack_pattern.temporal_patterns,
+                'attention_weights': attack_pattern.attention_weights,
                 'transfer_learning_info': {},
                 'proactive_indicators': {}
             }
@@ -303,93 +619,81 @@ class AdvancedSelfLearningSystem:
             # Transfer learning information
             if self.transfer_learning_enabled:
                 signature['transfer_learning_info'] = {
-                    'source_domain_similarity': self._calculate_domain_similarity(attack_data),
-                    'adaptation_confidence': self._calculate_adaptation_confidence(attack_data),
-                    'cross_domain_features': self._extract_cross_domain_features(attack_data)
+                    'source_domain_similarity': self._calculate_domain_similarity(view),
+                    'adaptation_confidence': self._calculate_adaptation_confidence(view),
+                    'cross_domain_features': self._extract_cross_domain_features(view)
                 }
             
             # Proactive indicators
             signature['proactive_indicators'] = {
-                'early_warning_signs': self._identify_early_warning_signs(attack_data),
-                'predictive_factors': self._identify_predictive_factors(attack_data),
-                'maintenance_triggers': self._identify_maintenance_triggers(attack_data)
+                'early_warning_signs': self._identify_early_warning_signs(view),
+                'predictive_factors': self._identify_predictive_factors(view),
+                'maintenance_triggers': self._identify_maintenance_triggers(view)
             }
             
             return signature
             
         except Exception as e:
-            self.logger.error(f"Error generating advanced signature: {e}")
+            self.logger.error("Error generating advanced signature: %s", e)
             return {}
     
-    def _calculate_domain_similarity(self, attack_data: Dict[str, Any]) -> float:
+    def _calculate_domain_similarity(self, view: AttackView) -> float:
         """Calculate similarity with source domain for transfer learning"""
         # Simplified domain similarity calculation
         similarity_score = 0.5  # Default similarity
         
         # Analyze feature similarity
-        if 'host_metrics' in attack_data:
-            host_features = self._extract_features_from_attack(attack_data)
+        if view.has_host:
+            host_features = self._extract_features_from_attack(view)
             if host_features:
                 # Calculate similarity with known patterns
                 similarity_score = min(1.0, len(host_features) / 10.0)
         
         return similarity_score
     
-    def _calculate_adaptation_confidence(self, attack_data: Dict[str, Any]) -> float:
+    def _calculate_adaptation_confidence(self, view: AttackView) -> float:
         """Calculate confidence in domain adaptation"""
         # Simplified adaptation confidence
         confidence = 0.7  # Default confidence
         
         # Adjust based on feature quality
-        if 'network_metrics' in attack_data:
-            network_features = attack_data['network_metrics'].get('features', {})
-            if network_features:
-                confidence = min(1.0, confidence + 0.1)
+        if view.network_features:
+            confidence = min(1.0, confidence + 0.1)
         
         return confidence
     
-    def _extract_cross_domain_features(self, attack_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _extract_cross_domain_features(self, view: AttackView) -> Dict[str, Any]:
         """Extract features that work across domains"""
         cross_domain_features = {}
         
         # Universal features that work across domains
-        if 'host_metrics' in attack_data:
-            host_metrics = attack_data['host_metrics']
-            if 'system' in host_metrics:
-                system = host_metrics['system']
-                cross_domain_features['resource_utilization'] = {
-                    'cpu': system.get('cpu', {}).get('percent', 0),
-                    'memory': system.get('memory', {}).get('percent', 0)
-                }
+        if view.has_system:
+            cross_domain_features['resource_utilization'] = {
+                'cpu': view.cpu,
+                'memory': view.memory
+            }
         
         return cross_domain_features
     
-    def _identify_early_warning_signs(self, attack_data: Dict[str, Any]) -> List[str]:
+    def _identify_early_warning_signs(self, view: AttackView) -> List[str]:
         """Identify early warning signs for proactive healing"""
         early_warnings = []
         
         # Resource-based early warnings
-        if 'host_metrics' in attack_data and 'system' in attack_data['host_metrics']:
-            system = attack_data['host_metrics']['system']
-            cpu = system.get('cpu', {}).get('percent', 0)
-            memory = system.get('memory', {}).get('percent', 0)
-            
-            if cpu > 70:
+        if view.has_system:
+            if view.cpu > 70:
                 early_warnings.append("High CPU usage detected")
-            if memory > 70:
+            if view.memory > 70:
                 early_warnings.append("High memory usage detected")
         
         # Network-based early warnings
-        if 'network_metrics' in attack_data and 'features' in attack_data['network_metrics']:
-            features = attack_data['network_metrics']['features']
-            foreign_connections = features.get('foreign_connections', 0)
-            
-            if foreign_connections > 5:
+        if view.network_features is not None:
+            if view.foreign_connections > 5:
                 early_warnings.append("Unusual foreign connections detected")
         
         return early_warnings
     
-    def _identify_predictive_factors(self, attack_data: Dict[str, Any]) -> List[str]:
+    def _identify_predictive_factors(self, view: AttackView) -> List[str]:
         """Identify predictive factors for future attacks"""
         predictive_factors = []
         
@@ -399,65 +703,51 @@ class AdvancedSelfLearningSystem:
             predictive_factors.append("Off-hours activity pattern")
         
         # Behavioral factors
-        if 'host_metrics' in attack_data and 'processes' in attack_data['host_metrics']:
-            processes = attack_data['host_metrics']['processes']
-            suspicious_count = sum(1 for p in processes if p.get('is_suspicious', False))
-            
-            if suspicious_count > 0:
-                predictive_factors.append("Suspicious process patterns")
+        if view.suspicious_processes:
+            predictive_factors.append("Suspicious process patterns")
         
         return predictive_factors
     
-    def _identify_maintenance_triggers(self, attack_data: Dict[str, Any]) -> List[str]:
+    def _identify_maintenance_triggers(self, view: AttackView) -> List[str]:
         """Identify maintenance triggers for proactive healing"""
         maintenance_triggers = []
         
         # System health triggers
-        if 'host_metrics' in attack_data and 'system' in attack_data['host_metrics']:
-            system = attack_data['host_metrics']['system']
-            disk_usage = system.get('disk', {}).get('percent', 0)
-            
-            if disk_usage > 80:
+        if view.has_system:
+            if view.disk > 80:
                 maintenance_triggers.append("High disk usage - cleanup recommended")
         
         # Performance triggers
-        if 'network_metrics' in attack_data and 'features' in attack_data['network_metrics']:
-            features = attack_data['network_metrics']['features']
-            total_events = features.get('total_events', 0)
-            
-            if total_events > 1000:
+        if view.network_features is not None:
+            if view.total_events > 1000:
                 maintenance_triggers.append("High network activity - monitoring recommended")
         
         return maintenance_triggers
     
-    def _analyze_proactive_healing_opportunities(self, attack_data: Dict[str, Any]):
+    def _analyze_proactive_healing_opportunities(self, view: AttackView):
         """Analyze opportunities for proactive healing"""
         try:
             # Update proactive thresholds
-            self._update_proactive_thresholds(attack_data)
+            self._update_proactive_thresholds(view)
             
             # Schedule predictive maintenance
-            self._schedule_predictive_maintenance(attack_data)
+            self._schedule_predictive_maintenance(view)
             
             # Update proactive healing models
-            self._update_proactive_models(attack_data)
+            self._update_proactive_models(view)
             
         except Exception as e:
-            self.logger.error(f"Error analyzing proactive healing opportunities: {e}")
+            self.logger.error("Error analyzing proactive healing opportunities: %s", e)
     
-    def _update_proactive_thresholds(self, attack_data: Dict[str, Any]):
+    def _update_proactive_thresholds(self, view: AttackView):
         """Update proactive healing thresholds based on attack patterns"""
         # Update thresholds based on attack characteristics
-        if 'host_metrics' in attack_data and 'system' in attack_data['host_metrics']:
-            system = attack_data['host_metrics']['system']
-            cpu = system.get('cpu', {}).get('percent', 0)
-            memory = system.get('memory', {}).get('percent', 0)
-            
+        if view.has_system:
             # Adjust thresholds based on observed patterns
-            self.proactive_thresholds['cpu_warning'] = min(80, cpu * 0.8)
-            self.proactive_thresholds['memory_warning'] = min(80, memory * 0.8)
+            self.proactive_thresholds['cpu_warning'] = min(view.cpu * 0.8, 80)
+            self.proactive_thresholds['memory_warning'] = min(view.memory * 0.8, 80)
     
-    def _schedule_predictive_maintenance(self, attack_data: Dict[str, Any]):
+    def _schedule_predictive_maintenance(self, view: AttackView):
         """Schedule predictive maintenance based on attack patterns"""
         # Schedule maintenance based on temporal patterns
         current_time = datetime.now()
@@ -470,10 +760,10 @@ class AdvancedSelfLearningSystem:
         else:  # Day attacks
             self.maintenance_schedule['day_maintenance'] = current_time + timedelta(minutes=30)
     
-    def _update_proactive_models(self, attack_data: Dict[str, Any]):
+    def _update_proactive_models(self, view: AttackView):
         """Update proactive healing models"""
         # Update models based on attack characteristics
-        attack_type = attack_data.get('threat_level', 'MEDIUM')
+        attack_type = view.threat_level
         
         if attack_type == 'HIGH':
             # High-threat attacks require immediate proactive measures
@@ -482,19 +772,19 @@ class AdvancedSelfLearningSystem:
             # Medium-threat attacks require scheduled proactive measures
             self.prediction_models['scheduled_proactive'] = True
     
-    def _update_predictive_maintenance(self, attack_data: Dict[str, Any]):
+    def _update_predictive_maintenance(self, view: AttackView):
         """Update predictive maintenance based on attack patterns"""
         try:
             # Analyze attack patterns for maintenance insights
-            maintenance_insights = self._analyze_maintenance_insights(attack_data)
+            maintenance_insights = self._analyze_maintenance_insights(view)
             
             # Update predictive models
             self._update_predictive_models(maintenance_insights)
             
         except Exception as e:
-            self.logger.error(f"Error updating predictive maintenance: {e}")
+            self.logger.error("Error updating predictive maintenance: %s", e)
     
-    def _analyze_maintenance_insights(self, attack_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_maintenance_insights(self, view: AttackView) -> Dict[str, Any]:
         """Analyze maintenance insights from attack patterns"""
         insights = {
             'system_health': 'good',
@@ -504,10 +794,9 @@ class AdvancedSelfLearningSystem:
         }
         
         # Analyze system health
-        if 'host_metrics' in attack_data and 'system' in attack_data['host_metrics']:
-            system = attack_data['host_metrics']['system']
-            cpu = system.get('cpu', {}).get('percent', 0)
-            memory = system.get('memory', {}).get('percent', 0)
+        if view.has_system:
+            cpu = view.cpu
+            memory = view.memory
             
             if cpu > 90 or memory > 90:
                 insights['system_health'] = 'poor'
@@ -538,7 +827,7 @@ class AdvancedSelfLearningSystem:
             self._update_domain_adaptation_models()
             
         except Exception as e:
-            self.logger.error(f"Error updating transfer learning: {e}")
+            self.logger.error("Error updating transfer learning: %s", e)
     
     def _update_domain_adaptation_models(self):
         """Update domain adaptation models"""
@@ -547,19 +836,20 @@ class AdvancedSelfLearningSystem:
             # Update adaptation models when enough target data is available
             self.domain_adaptation = True
     
-    def _save_advanced_learning_data(self, attack_pattern: Dict[str, Any], 
-                                   signature: Dict[str, Any], attack_data: Dict[str, Any]):
+    def _save_advanced_learning_data(self, attack_pattern: AttackPattern, 
+                                   signature: Dict[str, Any]):
         """Save advanced learning data with all components"""
         try:
             # Save attack pattern
             pattern_file = f"{self.learning_path}/patterns/pattern_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(pattern_file, 'w') as f:
-                json.dump(attack_pattern, f, indent=2)
+            self._writer.write_file(pattern_file, json.dumps(asdict(attack_pattern), indent=2))
             
             # Save signature
-            signature_file = f"{self.learning_path}/signatures/signature_{signature['id']}.json"
-            with open(signature_file, 'w') as f:
-                json.dump(signature, f, indent=2)
+            if PYARROW_AVAILABLE:
+                self._writer.add_signature(_flatten_signature(signature))
+            else:
+                signature_file = f"{self.learning_path}/signatures/signature_{signature['id']}.json"
+                self._writer.write_file(signature_file, json.dumps(signature, indent=2))
             
             # Save prediction data
             prediction_data = {
@@ -570,45 +860,42 @@ class AdvancedSelfLearningSystem:
             }
             
             prediction_file = f"{self.learning_path}/predictions/prediction_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(prediction_file, 'w') as f:
-                json.dump(prediction_data, f, indent=2)
+            self._writer.write_file(prediction_file, json.dumps(prediction_data, indent=2))
             
-            # Save proactive data
+            # Save proactive data (already computed for the signature)
             proactive_data = {
                 'timestamp': datetime.now().isoformat(),
-                'early_warning_signs': self._identify_early_warning_signs(attack_data),
-                'predictive_factors': self._identify_predictive_factors(attack_data),
-                'maintenance_triggers': self._identify_maintenance_triggers(attack_data)
+                **signature.get('proactive_indicators', {})
             }
             
             proactive_file = f"{self.learning_path}/proactive/proactive_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(proactive_file, 'w') as f:
-                json.dump(proactive_data, f, indent=2)
+            self._writer.write_file(proactive_file, json.dumps(proactive_data, indent=2))
             
-            self.logger.info("Advanced learning data saved successfully")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Advanced learning data queued for writing")
             
         except Exception as e:
-            self.logger.error(f"Error saving advanced learning data: {e}")
+            self.logger.error("Error saving advanced learning data: %s", e)
     
-    def _update_advanced_ml_models(self, attack_data: Dict[str, Any]):
+    def _update_advanced_ml_models(self, view: AttackView):
         """Update ML models with new knowledge"""
         try:
             # Update feature importance
-            self._update_feature_importance_from_attack(attack_data)
+            self._update_feature_importance_from_attack(view)
             
             # Update attention weights
-            self._update_attention_weights(attack_data)
+            self._update_attention_weights(view)
             
             # Update pattern recognition models
-            self._update_pattern_recognition_models(attack_data)
+            self._update_pattern_recognition_models(view)
             
         except Exception as e:
-            self.logger.error(f"Error updating advanced ML models: {e}")
+            self.logger.error("Error updating advanced ML models: %s", e)
     
-    def _update_feature_importance_from_attack(self, attack_data: Dict[str, Any]):
+    def _update_feature_importance_from_attack(self, view: AttackView):
         """Update feature importance based on attack data"""
         # Extract features and update importance
-        features = self._extract_features_from_attack(attack_data)
+        features = self._extract_features_from_attack(view)
         
         for feature_name, value in features.items():
             if feature_name not in self.feature_importance:
@@ -621,24 +908,30 @@ class AdvancedSelfLearningSystem:
                 alpha * value
             )
     
-    def _update_attention_weights(self, attack_data: Dict[str, Any]):
+    def _update_attention_weights(self, view: AttackView):
         """Update attention weights based on attack patterns"""
         # Update attention weights based on attack characteristics
-        threat_level = attack_data.get('threat_level', 'MEDIUM')
+        if not len(self._attention_arr):
+            return
+        
+        threat_level = view.threat_level
         
         if threat_level == 'HIGH':
             # High-threat attacks get higher attention weights
-            for feature in self.attention_weights:
-                self.attention_weights[feature] = min(1.0, self.attention_weights[feature] * 1.1)
+            factor, lower, upper = 1.1, None, 1.0
         elif threat_level == 'LOW':
             # Low-threat attacks get lower attention weights
-            for feature in self.attention_weights:
-                self.attention_weights[feature] = max(0.1, self.attention_weights[feature] * 0.9)
+            factor, lower, upper = 0.9, 0.1, None
+        else:
+            return
+        
+        np.multiply(self._attention_arr, factor, out=self._attention_arr)
+        np.clip(self._attention_arr, lower, upper, out=self._attention_arr)
     
-    def _update_pattern_recognition_models(self, attack_data: Dict[str, Any]):
+    def _update_pattern_recognition_models(self, view: AttackView):
         """Update pattern recognition models"""
         # Update models based on attack patterns
-        attack_pattern = self._extract_advanced_attack_pattern(attack_data)
+        attack_pattern = self._extract_advanced_attack_pattern(view)
         
         # Update pattern database
         pattern_id = f"pattern_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -3,29 +3,405 @@ Sistem Self-Learning untuk IDS/IPS Auto-Healing
 Mengekstrak pola dari serangan yang berhasil dideteksi dan memperbarui model
 """
 
+import base64
+import itertools
 import json
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 import logging
 import os
-from collections import defaultdict
+import queue
+import re
+import threading
+import time
+import weakref
+import zlib
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import blosc
+    BLOSC_AVAILABLE = True
+except ImportError:
+    BLOSC_AVAILABLE = False
+
+
+def _jsonize(obj: Any) -> Any:
+    """Konversi nilai numpy dan datetime yang tidak didukung JSON"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_bytes(obj: Any) -> bytes:
+    """Serialisasi obj sebagai JSON berindentasi (orjson jika tersedia)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, default=_jsonize,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(obj, indent=2, default=_jsonize).encode('utf-8')
+
+
+def _dump_json(path: str, obj: Any):
+    """Tulis obj ke file sebagai JSON berindentasi"""
+    with open(path, 'wb') as f:
+        f.write(_json_bytes(obj))
+
+
+def _json_line(obj: Any) -> bytes:
+    """Serialisasi obj sebagai satu baris JSONL"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, default=_jsonize,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+    return json.dumps(obj, default=_jsonize).encode('utf-8') + b'\n'
+
+
+def _encode_ndarrays(obj: Any) -> Any:
+    """Ganti ndarray dalam obj dengan bytes terkompresi (base64) beserta dtype/shape"""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            return obj.tolist()
+        raw = np.ascontiguousarray(obj).tobytes()
+        if BLOSC_AVAILABLE:
+            codec, data = 'blosc', blosc.compress(raw, typesize=obj.dtype.itemsize, cname='lz4')
+        else:
+            codec, data = 'zlib', zlib.compress(raw)
+        return {
+            "__nd__": True,
+            "dtype": obj.dtype.str,
+            "shape": list(obj.shape),
+            "codec": codec,
+            "data": base64.b64encode(data).decode('ascii')
+        }
+    
+    # Container hanya disalin jika ada elemen yang berubah
+    if isinstance(obj, dict):
+        encoded = None
+        for key, value in obj.items():
+            new_value = _encode_ndarrays(value)
+            if new_value is not value:
+                if encoded is None:
+                    encoded = dict(obj)
+                encoded[key] = new_value
+        return obj if encoded is None else encoded
+    if isinstance(obj, (list, tuple)):
+        items = [_encode_ndarrays(value) for value in obj]
+        if any(new is not old for new, old in zip(items, obj)):
+            return items
+        return obj
+    return obj
+
+
+def _decode_ndarrays(obj: Any) -> Any:
+    """Kebalikan dari _encode_ndarrays: pulihkan ndarray dari hasil load JSON"""
+    if isinstance(obj, dict):
+        if obj.get("__nd__"):
+            data = base64.b64decode(obj["data"])
+            if obj["codec"] == 'blosc':
+                raw = blosc.decompress(data)
+            else:
+                raw = zlib.decompress(data)
+            return np.frombuffer(raw, dtype=np.dtype(obj["dtype"])).reshape(obj["shape"])
+        return {key: _decode_ndarrays(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_decode_ndarrays(value) for value in obj]
+    return obj
+
+
+def _count_records(path: str) -> int:
+    """Hitung jumlah record (baris) dalam file JSONL"""
+    try:
+        with open(path, 'rb') as f:
+            return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 16), b''))
+    except FileNotFoundError:
+        return 0
+
+
+def _count_json_files(directory: str) -> int:
+    """Hitung file .json dalam direktori"""
+    try:
+        with os.scandir(directory) as entries:
+            return sum(1 for e in entries
+                       if e.name.endswith('.json') and e.is_file(follow_symlinks=False))
+    except FileNotFoundError:
+        return 0
+
+
+# Fitur deteksi dan bobot kontribusinya (urutan tetap, selaras dengan array)
+_FEATURE_NAMES = (
+    "cpu_usage", "memory_usage", "suspicious_processes",
+    "modified_files", "foreign_connections", "network_anomaly"
+)
+_FEATURE_WEIGHTS = np.array([0.15, 0.15, 0.25, 0.20, 0.15, 0.10])
+_FEATURE_LEARNING_RATE = 0.1
+
+# Ambang penggunaan CPU/memori (%) yang dianggap berkontribusi
+_HIGH_USAGE_PERCENT = 80
+
+# Batas signature terbaru yang disimpan di memori (riwayat lengkap ada di WAL)
+_MAX_IN_MEMORY_SIGNATURES = 10_000
+
+# Snapshot feature importance ditulis setiap N serangan
+_FI_SNAPSHOT_INTERVAL = 50
+
+# Nomor urut ID serangan/signature (unik walau dalam nanodetik yang sama)
+_ID_COUNTER = itertools.count()
+
+# File kredensial yang menandakan privilege escalation
+_PRIV_RX = re.compile(r'(?:passwd|shadow)')
+
+
+def _iso(ns: int) -> str:
+    """Format timestamp nanodetik sebagai ISO 8601 (waktu lokal)"""
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
+
+@dataclass(slots=True)
+class AttackPattern:
+    """Pola serangan yang diekstrak dari satu deteksi"""
+    timestamp: int  # nanodetik, diformat ISO saat serialisasi
+    attack_id: str
+    threat_level: str
+    host_patterns: Dict[str, Any] = field(default_factory=dict)
+    network_patterns: Dict[str, Any] = field(default_factory=dict)
+    temporal_patterns: Dict[str, Any] = field(default_factory=dict)
+    features: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Bentuk dict untuk serialisasi"""
+        timestamp = _iso(self.timestamp)
+        temporal_patterns = self.temporal_patterns
+        if 'detection_time' not in temporal_patterns:
+            # Serangan tanpa timestamp memakai waktu deteksi pola
+            temporal_patterns = {"detection_time": timestamp, **temporal_patterns}
+        return {
+            "timestamp": timestamp,
+            "attack_id": self.attack_id,
+            "threat_level": self.threat_level,
+            "features": self.features,
+            "network_patterns": self.network_patterns,
+            "host_patterns": self.host_patterns,
+            "temporal_patterns": temporal_patterns
+        }
+
+
+def _feature_mask(attack_pattern: AttackPattern, attack_data: Dict[str, Any]) -> np.ndarray:
+    """Mask 0/1 fitur yang berkontribusi pada serangan (urutan _FEATURE_NAMES)"""
+    host_patterns = attack_pattern.host_patterns
+    network_patterns = attack_pattern.network_patterns
+    anomaly_score = (attack_data.get('network_metrics') or {}).get('anomaly_score', 0)
+    return np.array([
+        (host_patterns.get('cpu_usage') or 0) > _HIGH_USAGE_PERCENT,
+        (host_patterns.get('memory_usage') or 0) > _HIGH_USAGE_PERCENT,
+        bool(host_patterns.get('suspicious_processes')),
+        bool(host_patterns.get('modified_files')),
+        bool(network_patterns.get('foreign_ips')),
+        bool(network_patterns.get('suspicious_patterns')) or (anomaly_score or 0) > 0
+    ], dtype=np.float64)
+
+
+@dataclass(slots=True)
+class Signature:
+    """Signature deteksi yang dihasilkan dari pola serangan"""
+    signature_id: str
+    created_at: int  # nanodetik, diformat ISO saat serialisasi
+    attack_type: str
+    severity: str
+    rules: List[Dict[str, Any]] = field(default_factory=list)
+    confidence: float = 0.8
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Bentuk dict untuk serialisasi"""
+        return {
+            "signature_id": self.signature_id,
+            "created_at": _iso(self.created_at),
+            "attack_type": self.attack_type,
+            "severity": self.severity,
+            "rules": self.rules,
+            "confidence": self.confidence
+        }
+
+
+class _LearningWriter:
+    """
+    Writer latar belakang untuk WAL pattern/signature dan snapshot feature importance
+    Antrian hanya berisi bytes dan salinan array; thread hanya mereferensikan
+    writer, sehingga SelfLearningSystem tetap bisa di-garbage-collect
+    """
+    
+    def __init__(self, root: Path, batch_size: int, logger: logging.Logger):
+        self.batch_size = batch_size
+        self._logger = logger
+        self._patterns_wal = root / 'patterns.jsonl'
+        self._signatures_wal = root / 'signatures.jsonl'
+        self._importance_file = root / 'feature_importance.json'
+        self._importance_tmp = root / 'feature_importance.json.tmp'
+        self._pending_patterns = []
+        self._pending_signatures = []
+        self._flush_lock = threading.Lock()
+        self._importance_stale = False
+        self._closed = False
+        self._q = queue.Queue(maxsize=1024)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def put(self, pattern_line: bytes, signature_line: bytes,
+            importance: Optional[np.ndarray] = None):
+        """Antrikan baris JSONL pattern dan signature, beserta snapshot importance jika ada"""
+        self._q.put((pattern_line, signature_line, importance))
+    
+    def write_file(self, path: Path, data: bytes):
+        """Antrikan penulisan satu file yang isinya sudah diserialisasi"""
+        self._q.put((path, data))
+    
+    def flush(self):
+        """Tunggu antrian habis lalu tulis semua batch tertunda ke WAL"""
+        self._q.join()
+        self._flush_batches(force=True)
+    
+    def close(self, importance: np.ndarray):
+        """Hentikan thread setelah semua data tertulis; importance adalah nilai akhirnya"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._q.put(None)
+            self._thread.join()
+        self._flush_batches(force=True)
+        if self._importance_stale:
+            self._write_feature_importance(importance)
+    
+    def _run(self):
+        """Ambil data pembelajaran dari antrian dan flush per batch"""
+        while True:
+            try:
+                item = self._q.get(timeout=1)
+            except queue.Empty:
+                # Antrian sepi: tulis sisa batch agar tidak tertahan lama
+                if self._pending_patterns:
+                    self._flush_batches(force=True)
+                continue
+            
+            items = [item]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = False
+            snapshot = None
+            files = []
+            with self._flush_lock:
+                for entry in items:
+                    if entry is None:
+                        stop = True
+                        continue
+                    if len(entry) == 2:
+                        files.append(entry)
+                        continue
+                    pattern_line, signature_line, importance = entry
+                    self._pending_patterns.append(pattern_line)
+                    self._pending_signatures.append(signature_line)
+                    # Snapshot ikut item yang sudah memperhitungkannya
+                    if importance is not None:
+                        snapshot = importance
+                        self._importance_stale = False
+                    else:
+                        self._importance_stale = True
+            
+            for path, data in files:
+                try:
+                    with open(path, 'wb') as f:
+                        f.write(data)
+                except Exception as e:
+                    self._logger.error("Error writing %s: %s", path, e)
+            
+            self._flush_batches(force=stop)
+            if snapshot is not None:
+                self._write_feature_importance(snapshot)
+            for _ in items:
+                self._q.task_done()
+            if stop:
+                break
+    
+    def _flush_batches(self, force: bool = False):
+        """Tulis batch pattern/signature tertunda ke WAL dalam satu kali tulis"""
+        with self._flush_lock:
+            if not force and len(self._pending_patterns) < self.batch_size:
+                return
+            
+            try:
+                for wal_file, pending in ((self._patterns_wal, self._pending_patterns),
+                                          (self._signatures_wal, self._pending_signatures)):
+                    if pending:
+                        with open(wal_file, 'ab') as f:
+                            f.writelines(pending)
+                        pending.clear()
+                
+            except Exception as e:
+                self._logger.error("Error flushing learning data: %s", e)
+    
+    def _write_feature_importance(self, importance: np.ndarray):
+        """Tulis snapshot feature importance secara atomik (file tmp lalu rename)"""
+        try:
+            _dump_json(self._importance_tmp, dict(zip(_FEATURE_NAMES, importance.tolist())))
+            os.replace(self._importance_tmp, self._importance_file)
+        except Exception as e:
+            self._logger.error("Error writing feature importance: %s", e)
+
 
 class SelfLearningSystem:
     """Kelas untuk sistem pembelajaran mandiri"""
     
-    def __init__(self, learning_path: str = "learning_data/"):
+    def __init__(self, learning_path: str = "learning_data/", batch_size: int = 32):
         self.learning_path = learning_path
         self.logger = self._setup_logger()
-        self.attack_patterns = {}
-        self.feature_importance = {}
-        self.signature_database = []
+        self.attack_patterns: Dict[str, AttackPattern] = {}
+        # float64: nilai ini dilaporkan apa adanya di JSON (float32 tampil sebagai 0.15000000596...)
+        self._fi = np.zeros(len(_FEATURE_NAMES))
+        self.signature_database = deque(maxlen=_MAX_IN_MEMORY_SIGNATURES)
+        
+        # WAL JSONL: pattern dan signature ditulis per batch, bukan per file
+        self.batch_size = batch_size
+        root = Path(learning_path)
+        self._patterns_dir = root / 'patterns'
+        self._signatures_dir = root / 'signatures'
+        self._attacks_dir = root / 'attacks'
+        self._patterns_wal = root / 'patterns.jsonl'
+        self._signatures_wal = root / 'signatures.jsonl'
+        self._fi_dirty_count = 0
         
         # Buat direktori learning jika belum ada
-        os.makedirs(learning_path, exist_ok=True)
-        os.makedirs(f"{learning_path}/patterns", exist_ok=True)
-        os.makedirs(f"{learning_path}/signatures", exist_ok=True)
+        for directory in (self._patterns_dir, self._signatures_dir, self._attacks_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        # Penghitung record, di-bootstrap sekali dari disk lalu dijaga di memori
+        self._pattern_count = _count_json_files(self._patterns_dir) + _count_records(self._patterns_wal)
+        self._signature_count = _count_json_files(self._signatures_dir) + _count_records(self._signatures_wal)
+        self._attack_count = _count_json_files(self._attacks_dir)
+        
+        # Writer latar belakang agar penulisan disk tidak memblokir deteksi.
+        # Ditutup oleh close(), saat sistem di-garbage-collect, atau saat exit;
+        # _fi hanya diubah in-place, jadi finalizer memegang array yang sama
+        self._writer = _LearningWriter(root, batch_size, self.logger)
+        self._close_writer = weakref.finalize(self, self._writer.close, self._fi)
     
     def _setup_logger(self) -> logging.Logger:
         """Setup logger untuk self-learning system"""
@@ -44,54 +420,59 @@ class SelfLearningSystem:
     def learn_from_attack(self, attack_data: Dict[str, Any]) -> bool:
         """Belajar dari serangan yang berhasil dideteksi"""
         try:
-            self.logger.info("Memulai pembelajaran dari serangan...")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Memulai pembelajaran dari serangan...")
+            
+            # Satu pembacaan jam dan satu ID untuk seluruh pembelajaran ini
+            now_ns = time.time_ns()
+            attack_id = f"attack_{now_ns}_{next(_ID_COUNTER)}"
             
             # 1. Ekstrak pola serangan
-            attack_pattern = self._extract_attack_pattern(attack_data)
+            attack_pattern = self._extract_attack_pattern(attack_data, now_ns, attack_id)
             
             # 2. Update feature importance
-            self._update_feature_importance(attack_data)
+            self._update_feature_importance(attack_pattern, attack_data)
             
             # 3. Generate signature baru
-            new_signature = self._generate_signature(attack_pattern, attack_data)
+            new_signature = self._generate_signature(attack_pattern, attack_data, now_ns)
             
             # 4. Simpan data pembelajaran
             self._save_learning_data(attack_pattern, new_signature)
             
             # 5. Update model ML jika diperlukan
-            self._update_ml_model(attack_data)
+            self._update_ml_model(attack_data, attack_id)
             
-            self.logger.info("Pembelajaran selesai")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Pembelajaran selesai")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error in self-learning: {e}")
+            self.logger.error("Error in self-learning: %s", e)
             return False
     
-    def _extract_attack_pattern(self, attack_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _extract_attack_pattern(self, attack_data: Dict[str, Any], now_ns: int,
+                                attack_id: str) -> AttackPattern:
         """Ekstrak pola unik dari serangan"""
-        pattern = {
-            "timestamp": datetime.now().isoformat(),
-            "attack_id": f"attack_{int(datetime.now().timestamp())}",
-            "threat_level": attack_data.get('threat_level', 'UNKNOWN'),
-            "features": {},
-            "network_patterns": {},
-            "host_patterns": {},
-            "temporal_patterns": {}
-        }
+        pattern = AttackPattern(
+            timestamp=now_ns,
+            attack_id=attack_id,
+            threat_level=attack_data.get('threat_level', 'UNKNOWN')
+        )
         
         # Ekstrak fitur host
         host_metrics = attack_data.get('host_metrics', {})
         if host_metrics:
-            pattern["host_patterns"] = {
-                "cpu_usage": host_metrics.get('system', {}).get('cpu', {}).get('percent', 0),
-                "memory_usage": host_metrics.get('system', {}).get('memory', {}).get('percent', 0),
+            system = host_metrics.get('system') or {}
+            critical_files = host_metrics.get('critical_files') or {}
+            pattern.host_patterns = {
+                "cpu_usage": (system.get('cpu') or {}).get('percent', 0),
+                "memory_usage": (system.get('memory') or {}).get('percent', 0),
                 "suspicious_processes": [
-                    p for p in host_metrics.get('processes', [])
+                    p for p in host_metrics.get('processes') or ()
                     if p.get('is_suspicious', False)
                 ],
                 "modified_files": [
-                    f for f, info in host_metrics.get('critical_files', {}).items()
+                    f for f, info in critical_files.items()
                     if info.get('exists') and info.get('modified')
                 ]
             }
@@ -100,7 +481,7 @@ class SelfLearningSystem:
         network_metrics = attack_data.get('network_metrics', {})
         if network_metrics:
             features = network_metrics.get('features', {})
-            pattern["network_patterns"] = {
+            pattern.network_patterns = {
                 "foreign_ips": network_metrics.get('foreign_ips', []),
                 "unique_ports": features.get('unique_ports', []),
                 "protocols": features.get('protocols', {}),
@@ -110,11 +491,11 @@ class SelfLearningSystem:
             }
         
         # Ekstrak pola temporal
-        pattern["temporal_patterns"] = {
-            "detection_time": attack_data.get('timestamp', datetime.now().isoformat()),
-            "response_time": attack_data.get('response_time_seconds', 0),
-            "duration": self._calculate_attack_duration(attack_data)
-        }
+        temporal_patterns = pattern.temporal_patterns
+        if 'timestamp' in attack_data:
+            temporal_patterns["detection_time"] = attack_data['timestamp']
+        temporal_patterns["response_time"] = attack_data.get('response_time_seconds', 0)
+        temporal_patterns["duration"] = self._calculate_attack_duration(attack_data)
         
         return pattern
     
@@ -124,203 +505,229 @@ class SelfLearningSystem:
         # Dalam implementasi nyata, akan ada timestamp yang lebih akurat
         return attack_data.get('response_time_seconds', 0)
     
-    def _update_feature_importance(self, attack_data: Dict[str, Any]):
-        """Update importance score untuk setiap fitur"""
-        # Hitung kontribusi setiap fitur dalam deteksi
-        feature_weights = {
-            "cpu_usage": 0.15,
-            "memory_usage": 0.15,
-            "suspicious_processes": 0.25,
-            "modified_files": 0.20,
-            "foreign_connections": 0.15,
-            "network_anomaly": 0.10
-        }
+    @property
+    def feature_importance(self) -> Dict[str, float]:
+        """Importance score per fitur sebagai dict"""
+        return dict(zip(_FEATURE_NAMES, self._fi.tolist()))
+    
+    def _update_feature_importance(self, attack_pattern: AttackPattern,
+                                   attack_data: Dict[str, Any]):
+        """Update importance score untuk fitur yang berkontribusi"""
+        mask = _feature_mask(attack_pattern, attack_data)
+        if not mask.any():
+            return
         
-        # Update feature importance berdasarkan serangan ini
-        for feature, weight in feature_weights.items():
-            if feature not in self.feature_importance:
-                self.feature_importance[feature] = 0.0
-            
-            # Tambahkan weight ke importance score
-            self.feature_importance[feature] += weight * 0.1  # Learning rate
+        # Tambahkan kontribusi fitur yang aktif (bobot * learning rate)
+        self._fi += _FEATURE_WEIGHTS * mask * _FEATURE_LEARNING_RATE
         
         # Normalisasi importance scores
-        total_importance = sum(self.feature_importance.values())
+        total_importance = self._fi.sum()
         if total_importance > 0:
-            for feature in self.feature_importance:
-                self.feature_importance[feature] /= total_importance
+            self._fi /= total_importance
     
-    def _generate_signature(self, attack_pattern: Dict[str, Any], 
-                          attack_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_signature(self, attack_pattern: AttackPattern, 
+                          attack_data: Dict[str, Any], now_ns: int) -> Signature:
         """Generate signature baru berdasarkan pola serangan"""
-        signature = {
-            "signature_id": f"sig_{int(datetime.now().timestamp())}",
-            "created_at": datetime.now().isoformat(),
-            "attack_type": self._classify_attack_type(attack_pattern),
-            "severity": attack_data.get('threat_level', 'MEDIUM'),
-            "rules": [],
-            "confidence": 0.8
-        }
+        signature = Signature(
+            signature_id=attack_pattern.attack_id.replace('attack_', 'sig_', 1),
+            created_at=now_ns,
+            attack_type=self._classify_attack_type(attack_pattern),
+            severity=attack_data.get('threat_level', 'MEDIUM')
+        )
         
         # Generate rules berdasarkan pola
         rules = []
         
-        # Rule untuk proses mencurigakan
-        suspicious_procs = attack_pattern.get('host_patterns', {}).get('suspicious_processes', [])
-        for proc in suspicious_procs:
-            rules.append({
-                "type": "process",
-                "condition": f"process_name == '{proc.get('name', '')}'",
-                "action": "alert",
-                "description": f"Suspicious process detected: {proc.get('name', '')}"
-            })
+        host_patterns = attack_pattern.host_patterns
+        network_patterns = attack_pattern.network_patterns
+        
+        # Rule untuk proses mencurigakan (satu rule per nama proses)
+        suspicious_procs = host_patterns.get('suspicious_processes', [])
+        proc_names = dict.fromkeys(p.get('name') for p in suspicious_procs if p.get('name'))
+        rules.extend({
+            "type": "process",
+            "condition": "process_name == '" + name + "'",
+            "action": "alert",
+            "description": "Suspicious process detected: " + name
+        } for name in proc_names)
         
         # Rule untuk file kritis
-        modified_files = attack_pattern.get('host_patterns', {}).get('modified_files', [])
-        for file_path in modified_files:
-            rules.append({
-                "type": "file",
-                "condition": f"file_modified == '{file_path}'",
-                "action": "alert",
-                "description": f"Critical file modified: {file_path}"
-            })
+        modified_files = dict.fromkeys(host_patterns.get('modified_files', []))
+        rules.extend({
+            "type": "file",
+            "condition": "file_modified == '" + file_path + "'",
+            "action": "alert",
+            "description": "Critical file modified: " + file_path
+        } for file_path in modified_files)
         
         # Rule untuk IP asing
-        foreign_ips = attack_pattern.get('network_patterns', {}).get('foreign_ips', [])
-        for ip in foreign_ips[:5]:  # Limit to 5 IPs
-            rules.append({
-                "type": "network",
-                "condition": f"dest_ip == '{ip}'",
-                "action": "block",
-                "description": f"Connection to foreign IP: {ip}"
-            })
+        foreign_ips = list(dict.fromkeys(network_patterns.get('foreign_ips', [])))[:5]  # Limit to 5 IPs
+        rules.extend({
+            "type": "network",
+            "condition": "dest_ip == '" + ip + "'",
+            "action": "block",
+            "description": "Connection to foreign IP: " + ip
+        } for ip in foreign_ips)
         
         # Rule untuk port scanning
-        unique_ports = attack_pattern.get('network_patterns', {}).get('unique_ports', [])
-        if len(unique_ports) > 10:
+        unique_port_count = len(network_patterns.get('unique_ports', []))
+        if unique_port_count > 10:
             rules.append({
                 "type": "network",
-                "condition": f"unique_ports > 10",
+                "condition": "unique_ports > 10",
                 "action": "alert",
                 "description": "Potential port scanning detected"
             })
         
-        signature["rules"] = rules
+        signature.rules = rules
         return signature
     
-    def _classify_attack_type(self, attack_pattern: Dict[str, Any]) -> str:
+    def _classify_attack_type(self, attack_pattern: AttackPattern) -> str:
         """Klasifikasi jenis serangan berdasarkan pola"""
-        host_patterns = attack_pattern.get('host_patterns', {})
-        network_patterns = attack_pattern.get('network_patterns', {})
+        host_patterns = attack_pattern.host_patterns
+        network_patterns = attack_pattern.network_patterns
+        modified_files = host_patterns.get('modified_files') or []
         
+        # Urutan cek menentukan prioritas klasifikasi, jangan diubah
         # Cek indikator ransomware
-        if (host_patterns.get('cpu_usage', 0) > 80 and 
-            host_patterns.get('memory_usage', 0) > 80 and
-            len(host_patterns.get('modified_files', [])) > 3):
+        if (len(modified_files) > 3 and
+            host_patterns.get('cpu_usage', 0) > 80 and 
+            host_patterns.get('memory_usage', 0) > 80):
             return "RANSOMWARE"
         
         # Cek indikator port scanning
-        if len(network_patterns.get('unique_ports', [])) > 20:
+        if len(network_patterns.get('unique_ports') or ()) > 20:
             return "PORT_SCAN"
         
         # Cek indikator data exfiltration
-        if (len(network_patterns.get('foreign_ips', [])) > 5 and
+        if (len(network_patterns.get('foreign_ips') or ()) > 5 and
             network_patterns.get('connection_count', 0) > 100):
             return "DATA_EXFILTRATION"
         
         # Cek indikator privilege escalation
-        if any('passwd' in f or 'shadow' in f for f in host_patterns.get('modified_files', [])):
+        search = _PRIV_RX.search
+        if any(map(search, modified_files)):
             return "PRIVILEGE_ESCALATION"
         
         return "UNKNOWN"
     
-    def _save_learning_data(self, attack_pattern: Dict[str, Any], 
-                          signature: Dict[str, Any]):
+    def _save_learning_data(self, attack_pattern: AttackPattern, 
+                          signature: Signature):
         """Simpan data pembelajaran"""
         try:
-            # Simpan attack pattern
-            pattern_file = f"{self.learning_path}/patterns/{attack_pattern['attack_id']}.json"
-            with open(pattern_file, 'w') as f:
-                json.dump(attack_pattern, f, indent=2)
-            
-            # Simpan signature
-            signature_file = f"{self.learning_path}/signatures/{signature['signature_id']}.json"
-            with open(signature_file, 'w') as f:
-                json.dump(signature, f, indent=2)
+            # Serialisasi di thread ini: writer hanya menerima bytes, bukan objek
+            # yang masih bisa berubah
+            pattern_line = _json_line(attack_pattern.to_dict())
+            signature_line = _json_line(signature.to_dict())
             
             # Update signature database
             self.signature_database.append(signature)
+            self._pattern_count += 1
+            self._signature_count += 1
+            
+            # Snapshot feature importance berkala berupa salinan _fi
+            self._fi_dirty_count += 1
+            importance = None
+            if self._fi_dirty_count >= _FI_SNAPSHOT_INTERVAL:
+                importance = self._fi.copy()
+                self._fi_dirty_count = 0
             
-            # Simpan feature importance
-            importance_file = f"{self.learning_path}/feature_importance.json"
-            with open(importance_file, 'w') as f:
-                json.dump(self.feature_importance, f, indent=2)
+            # Serahkan penulisan ke writer latar belakang
+            self._writer.put(pattern_line, signature_line, importance)
             
-            self.logger.info(f"Learning data saved: {attack_pattern['attack_id']}")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Learning data saved: %s", attack_pattern.attack_id)
             
         except Exception as e:
-            self.logger.error(f"Error saving learning data: {e}")
+            self.logger.error("Error saving learning data: %s", e)
+    
+    def close(self):
+        """Hentikan writer setelah semua data pembelajaran tertulis"""
+        self._close_writer()
     
-    def _update_ml_model(self, attack_data: Dict[str, Any]):
+    def _update_ml_model(self, attack_data: Dict[str, Any], attack_id: str):
         """Update model ML dengan data serangan baru"""
         try:
-            # Simpan data serangan untuk retraining
-            attack_file = f"{self.learning_path}/attacks/attack_{int(datetime.now().timestamp())}.json"
-            os.makedirs(f"{self.learning_path}/attacks", exist_ok=True)
-            
-            with open(attack_file, 'w') as f:
-                json.dump(attack_data, f, indent=2)
+            # Simpan data serangan untuk retraining: serialisasi di sini (attack_data
+            # milik pemanggil), penulisan file oleh writer latar belakang
+            attack_file = self._attacks_dir / f"{attack_id}.json"
+            self._writer.write_file(attack_file, _json_bytes(_encode_ndarrays(attack_data)))
+            self._attack_count += 1
             
             # Trigger retraining jika ada cukup data baru
             self._check_retraining_trigger()
             
         except Exception as e:
-            self.logger.error(f"Error updating ML model: {e}")
+            self.logger.error("Error updating ML model: %s", e)
     
     def _check_retraining_trigger(self):
         """Cek apakah perlu retraining model"""
-        attacks_dir = f"{self.learning_path}/attacks"
-        if not os.path.exists(attacks_dir):
-            return
-        
-        attack_files = [f for f in os.listdir(attacks_dir) if f.endswith('.json')]
-        
         # Retrain jika ada 10 serangan baru
-        if len(attack_files) >= 10:
+        if self._attack_count >= 10:
             self.logger.info("Triggering model retraining...")
             # Di sini akan dipanggil fungsi retraining model
             # self._retrain_model()
     
+    def load_attack_data(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Muat data serangan yang disimpan untuk retraining (terlama dulu; limit =
+        hanya N terbaru), dengan ndarray dipulihkan dari bentuk terkompresinya
+        """
+        # Nama file attack_<nanodetik>_<urutan>.json terurut sesuai waktu
+        self._writer.flush()
+        paths = sorted(self._attacks_dir.glob('attack_*.json'))
+        if limit is not None:
+            paths = paths[-limit:] if limit > 0 else []
+        
+        attacks = []
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    attacks.append(_decode_ndarrays(json.load(f)))
+            except Exception as e:
+                self.logger.error("Error loading attack data %s: %s", path, e)
+        return attacks
+    
     def get_learning_stats(self) -> Dict[str, Any]:
         """Dapatkan statistik pembelajaran"""
         try:
-            patterns_dir = f"{self.learning_path}/patterns"
-            signatures_dir = f"{self.learning_path}/signatures"
-            
-            pattern_count = len([f for f in os.listdir(patterns_dir) if f.endswith('.json')]) if os.path.exists(patterns_dir) else 0
-            signature_count = len([f for f in os.listdir(signatures_dir) if f.endswith('.json')]) if os.path.exists(signatures_dir) else 0
-            
             return {
-                "total_patterns_learned": pattern_count,
-                "total_signatures_generated": signature_count,
+                "total_patterns_learned": self._pattern_count,
+                "total_signatures_generated": self._signature_count,
                 "feature_importance": self.feature_importance,
                 "recent_attacks": len(self.signature_database),
                 "learning_active": True
             }
             
         except Exception as e:
-            self.logger.error(f"Error getting learning stats: {e}")
+            self.logger.error("Error getting learning stats: %s", e)
             return {"error": str(e)}
     
     def export_signatures(self, output_file: str = "generated_signatures.json"):
         """Export semua signature yang dihasilkan"""
         try:
-            with open(output_file, 'w') as f:
-                json.dump(self.signature_database, f, indent=2)
+            # Stream dari WAL sebagai array JSON tanpa memuat semua signature
+            self._writer.flush()
+            with open(output_file, 'wb') as out:
+                out.write(b'[')
+                first = True
+                try:
+                    with open(self._signatures_wal, 'rb') as wal:
+                        for line in wal:
+                            line = line.rstrip(b'\n')
+                            if not line:
+                                continue
+                            if not first:
+                                out.write(b',\n')
+                            out.write(line)
+                            first = False
+                except FileNotFoundError:
+                    pass
+                out.write(b']\n')
             
-            self.logger.info(f"Signatures exported to {output_file}")
+            self.logger.info("Signatures exported to %s", output_file)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error exporting signatures: {e}")
+            self.logger.error("Error exporting signatures: %s", e)
             return False
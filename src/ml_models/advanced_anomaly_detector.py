@@ -11,15 +11,138 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import silhouette_score
 from sklearn.neural_network import MLPClassifier
 from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import NearestNeighbors
+from threadpoolctl import ThreadpoolController
 import joblib
 import json
 import os
 import logging
+import time
 from datetime import datetime
 from typing import Dict, List, Any, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        def decorator(func):
+            return func
+        return decorator
+
+# Below this many rows the MLP's 10% validation split is too small to hold
+# out both classes, so early stopping is left off
+_MLP_EARLY_STOPPING_MIN_SAMPLES = 100
+
+@njit(cache=True)
+def _entropy(codes):
+    """Shannon entropy (bits) of an int64 code array, counting runs of the sorted codes"""
+    n = codes.size
+    if n == 0:
+        return 0.0
+    
+    ordered = np.sort(codes)
+    entropy = 0.0
+    run = 1
+    for i in range(1, n):
+        if ordered[i] == ordered[i - 1]:
+            run += 1
+        else:
+            p = run / n
+            entropy -= p * np.log2(p)
+            run = 1
+    p = run / n
+    entropy -= p * np.log2(p)
+    return entropy
+
+
+# Host system features: paths into host_metrics['system'], in feature order
+_SYSTEM_FEATURE_PATHS = (
+    ('cpu', 'percent'), ('cpu', 'load_avg_1m'), ('cpu', 'load_avg_5m'), ('cpu', 'load_avg_15m'),
+    ('memory', 'percent'), ('memory', 'available'), ('memory', 'used'), ('memory', 'cached'),
+    ('disk', 'percent'), ('disk', 'read_bytes'), ('disk', 'write_bytes')
+)
+
+
+def _pluck(data: Dict[str, Any], path: Tuple[str, ...], default: Any = 0) -> Any:
+    """Follow path through nested dicts; default when a level is missing or None"""
+    for key in path:
+        data = data.get(key)
+        if data is None:
+            return default
+    return data
+
+
+# Cyclical encodings per hour of day and day of week: (sin, cos)
+_HOUR_TRIG = list(zip(np.sin(2 * np.pi * np.arange(24) / 24).tolist(),
+                      np.cos(2 * np.pi * np.arange(24) / 24).tolist()))
+_DOW_TRIG = list(zip(np.sin(2 * np.pi * np.arange(7) / 7).tolist(),
+                     np.cos(2 * np.pi * np.arange(7) / 7).tolist()))
+
+# Temporal features are reused for this many seconds
+_TEMPORAL_TTL = 1.0
+
+# Models loaded per model directory: path -> (newest file mtime, {attribute: value}),
+# shared by all detectors in the process so a reload skips unpickling
+_MODEL_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+# Created on first use; inspecting the loaded BLAS libraries is not free
+_THREADPOOL_CONTROLLER = None
+
+
+def _fit_estimator(estimator, X: np.ndarray, y: np.ndarray = None):
+    """Fit one estimator, returning it (unit of work for the parallel training)"""
+    if y is None:
+        return estimator.fit(X)
+    return estimator.fit(X, y)
+
+
+def _blas_single_thread():
+    """Context manager limiting BLAS to one thread for single-row inference"""
+    global _THREADPOOL_CONTROLLER
+    if _THREADPOOL_CONTROLLER is None:
+        _THREADPOOL_CONTROLLER = ThreadpoolController()
+    return _THREADPOOL_CONTROLLER.limit(limits=1, user_api='blas')
+
+
+# Weighted ensemble (give more weight to better performing models)
+_ENSEMBLE_WEIGHTS = {
+    'isolation_forest': 0.25,
+    'kmeans': 0.15,
+    'dbscan': 0.15,
+    'random_forest': 0.20,
+    'mlp': 0.15,
+    'logistic_regression': 0.10
+}
+
+# Fixed model order of the score/vote arrays and the matching weight vector
+_ENSEMBLE_MODELS = tuple(_ENSEMBLE_WEIGHTS)
+_ENSEMBLE_WEIGHT_VECTOR = np.array([_ENSEMBLE_WEIGHTS[model] for model in _ENSEMBLE_MODELS])
+
+
+def _feature_layout(host_metrics: Dict[str, Any], network_metrics: Dict[str, Any]) -> Tuple[bool, bool, bool]:
+    """Which feature sections (system, processes, network) a sample provides"""
+    return ('system' in host_metrics, 'processes' in host_metrics, 'features' in network_metrics)
+
+
+@njit(cache=True)
+def _fuse_scores(scores, votes, weights):
+    """Weighted ensemble score and anomaly vote count for each row of scores/votes"""
+    n_rows, n_models = scores.shape
+    weighted = np.zeros(n_rows)
+    anomaly_votes = np.zeros(n_rows, dtype=np.int64)
+    for i in range(n_rows):
+        for j in range(n_models):
+            weighted[i] += scores[i, j] * weights[j]
+            if votes[i, j]:
+                anomaly_votes[i] += 1
+    return weighted, anomaly_votes
+
 class AdvancedAnomalyDetector:
     """
     Advanced Anomaly Detection System incorporating:
@@ -29,15 +152,23 @@ class AdvancedAnomalyDetector:
     - Explainable AI for interpretability
     """
     
-    def __init__(self, model_path: str = "models/"):
+    def __init__(self, model_path: str = "models/", train_dbscan: bool = False):
         self.model_path = model_path
+        # Detection only needs DBSCAN's eps/min_samples (see dbscan_neighbors);
+        # fitting it on the training data is kept for offline cluster analysis
+        self.train_dbscan = train_dbscan
         self.logger = self._setup_logger()
         self.scaler = StandardScaler()
         
+        # Fitted scaler statistics for the inline transform (see _scale)
+        self._scaler_mean = None
+        self._scaler_scale = None
+        
         # Multiple ML models for ensemble approach
         self.isolation_forest = None
         self.kmeans = None
         self.dbscan = None
+        self.dbscan_neighbors = None
         self.random_forest = None
         self.mlp_classifier = None
         self.logistic_regression = None
@@ -57,9 +188,29 @@ class AdvancedAnomalyDetector:
         self.feature_columns = []
         self.is_trained = False
         
+        # (computed_at, temporal features) reused within _TEMPORAL_TTL
+        self._temporal_cache = (0.0, [])
+        
+        # (feature_importance dict, explanation text) for _top_features_text
+        self._top_features_cache = (None, "")
+        
         # Create model directory
         os.makedirs(model_path, exist_ok=True)
     
+    @property
+    def attention_weights(self) -> Dict[str, float]:
+        """Attention weight per feature"""
+        return self._attention_weights
+    
+    @attention_weights.setter
+    def attention_weights(self, weights: Dict[str, float]):
+        # Keep the weights as an array too, so applying them is a single multiply
+        self._attention_weights = weights
+        self._attention_arr = (
+            np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+            if weights else None
+        )
+    
     def _setup_logger(self) -> logging.Logger:
         """Setup logger for advanced anomaly detector"""
         logger = logging.getLogger('AdvancedAnomalyDetector')
@@ -87,30 +238,8 @@ class AdvancedAnomalyDetector:
             if 'system' in host_metrics:
                 system = host_metrics['system']
                 
-                # CPU features with temporal attention
-                cpu_features = [
-                    system.get('cpu', {}).get('percent', 0),
-                    system.get('cpu', {}).get('load_avg_1m', 0),
-                    system.get('cpu', {}).get('load_avg_5m', 0),
-                    system.get('cpu', {}).get('load_avg_15m', 0)
-                ]
-                
-                # Memory features with attention
-                memory_features = [
-                    system.get('memory', {}).get('percent', 0),
-                    system.get('memory', {}).get('available', 0),
-                    system.get('memory', {}).get('used', 0),
-                    system.get('memory', {}).get('cached', 0)
-                ]
-                
-                # Disk features
-                disk_features = [
-                    system.get('disk', {}).get('percent', 0),
-                    system.get('disk', {}).get('read_bytes', 0),
-                    system.get('disk', {}).get('write_bytes', 0)
-                ]
-                
-                features.extend(cpu_features + memory_features + disk_features)
+                # CPU, memory and disk features with attention
+                features.extend([_pluck(system, path) for path in _SYSTEM_FEATURE_PATHS])
             
             # 2. Process-based features with behavioral analysis
             if 'processes' in host_metrics:
@@ -181,71 +310,154 @@ class AdvancedAnomalyDetector:
                 network_anomaly_score = network_metrics.get('anomaly_score', 0)
                 features.append(network_anomaly_score)
             
-            # Convert to numpy array and handle missing values
-            features_array = np.array(features, dtype=np.float64)
-            features_array = np.nan_to_num(features_array, nan=0.0, posinf=0.0, neginf=0.0)
+            # Convert to numpy array and handle missing values; float32 halves the
+            # memory traffic of scaling and scoring (trees compare in float32 anyway)
+            features_array = np.array(features, dtype=np.float32)
+            np.nan_to_num(features_array, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
             
             # Apply attention weights if available
-            if self.attention_weights:
-                features_array = self._apply_attention_weights(features_array)
+            features_array = self._apply_attention_weights(features_array)
             
             return features_array
             
         except Exception as e:
             self.logger.error(f"Error preparing advanced features: {e}")
-            return np.zeros(20)  # Return default features
+            return np.zeros(20, dtype=np.float32)  # Return default features
+    
+    def prepare_advanced_features_batch(self, samples: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> np.ndarray:
+        """
+        Batched feature engineering for many (host_metrics, network_metrics) pairs
+        Builds the feature matrix column by column; per-process statistics are
+        computed with segmented reductions over a flattened process array
+        """
+        n = len(samples)
+        hosts = [host_metrics for host_metrics, _ in samples]
+        networks = [network_metrics for _, network_metrics in samples]
+        
+        # Column layout depends on which sections are present; rows with
+        # different layouts have different widths and cannot share a matrix
+        layouts = {_feature_layout(h, m) for h, m in samples}
+        if len(layouts) > 1:
+            raise ValueError(
+                f"Batch mixes {len(layouts)} metric layouts; "
+                "group samples by layout before building features"
+            )
+        
+        # Preallocate the (N, F) matrix and fill it column by column
+        layout = layouts.pop() if n else (False, False, False)
+        n_features = len(_SYSTEM_FEATURE_PATHS) * layout[0] + 7 * layout[1] + 8 * layout[2]
+        if n_features:
+            n_features += 5  # temporal features + network anomaly score
+        features_matrix = np.empty((n, n_features), dtype=np.float32)
+        column = 0
+        
+        # 1. Host-based features
+        if layout[0]:
+            systems = [h['system'] for h in hosts]
+            for path in _SYSTEM_FEATURE_PATHS:
+                features_matrix[:, column] = [_pluck(s, path) for s in systems]
+                column += 1
+        
+        # 2. Process-based features
+        if layout[1]:
+            process_lists = [h['processes'] for h in hosts]
+            counts = np.array([len(procs) for procs in process_lists], dtype=np.float64)
+            flat = [p for procs in process_lists for p in procs]
+            
+            process_features = features_matrix[:, column:column + 7]
+            process_features[:, 0] = counts
+            process_features[:, 1:] = 0.0
+            
+            if flat:
+                # Segment starts of the non-empty process lists
+                nonempty = counts > 0
+                starts = (np.cumsum(counts) - counts)[nonempty].astype(np.intp)
+                sizes = counts[nonempty]
+                
+                cpu = np.array([p.get('cpu_percent', 0) for p in flat], dtype=np.float64)
+                memory = np.array([p.get('memory_percent', 0) for p in flat], dtype=np.float64)
+                is_suspicious = np.array([bool(p.get('is_suspicious', False)) for p in flat], dtype=np.float64)
+                
+                avg_cpu = np.add.reduceat(cpu, starts) / sizes
+                cpu_var = np.add.reduceat(cpu * cpu, starts) / sizes - avg_cpu ** 2
+                
+                process_features[nonempty, 1] = np.add.reduceat(is_suspicious, starts) / sizes
+                process_features[nonempty, 2] = avg_cpu
+                process_features[nonempty, 3] = np.maximum.reduceat(cpu, starts)
+                process_features[nonempty, 4] = np.sqrt(np.maximum(cpu_var, 0.0))
+                process_features[nonempty, 5] = np.add.reduceat(memory, starts) / sizes
+                process_features[nonempty, 6] = np.maximum.reduceat(memory, starts)
+            column += 7
+        
+        # 3. Network-based features
+        if layout[2]:
+            network = [m['features'] for m in networks]
+            unique_ports = [f.get('unique_ports', []) for f in network]
+            
+            for values in (
+                [f.get('total_events', 0) for f in network],
+                [f.get('foreign_connections', 0) for f in network],
+                [len(ports) for ports in unique_ports],
+                [len(f.get('suspicious_patterns', [])) for f in network],
+                [len(set(ports)) for ports in unique_ports],
+                [self._calculate_entropy(ports) for ports in unique_ports],
+                [f.get('packet_size_variance', 0) for f in network],
+                [f.get('connection_duration_avg', 0) for f in network]
+            ):
+                features_matrix[:, column] = values
+                column += 1
+        
+        # 4. Advanced statistical features
+        if n_features:
+            # Temporal features are the same for every row of the batch
+            features_matrix[:, column:column + 4] = self._extract_temporal_features({}, {})
+            features_matrix[:, column + 4] = [m.get('anomaly_score', 0) for m in networks]
+        
+        np.nan_to_num(features_matrix, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        
+        # Apply attention weights if available
+        if self._attention_arr is not None and len(self._attention_arr) == n_features:
+            features_matrix *= self._attention_arr
+        
+        return features_matrix
     
     def _calculate_entropy(self, data: List) -> float:
         """Calculate entropy for diversity measurement"""
         if not data:
             return 0.0
         
-        # Count occurrences
-        counts = {}
-        for item in data:
-            counts[item] = counts.get(item, 0) + 1
-        
-        # Calculate entropy
-        total = len(data)
-        entropy = 0.0
-        for count in counts.values():
-            p = count / total
-            if p > 0:
-                entropy -= p * np.log2(p)
-        
-        return entropy
+        # Equal items hash equally, so entropy over the hashes is the entropy of the data
+        codes = np.fromiter(map(hash, data), dtype=np.int64, count=len(data))
+        return float(_entropy(codes))
     
     def _extract_temporal_features(self, host_metrics: Dict[str, Any], 
                                  network_metrics: Dict[str, Any]) -> List[float]:
         """Extract temporal features for better time-series analysis"""
-        temporal_features = []
+        now = time.time()
+        computed_at, temporal_features = self._temporal_cache
+        if now - computed_at < _TEMPORAL_TTL:
+            return temporal_features
         
         # Time-based features (if timestamp available)
-        current_time = datetime.now()
-        hour = current_time.hour
-        day_of_week = current_time.weekday()
+        current_time = datetime.fromtimestamp(now)
         
         # Cyclical encoding for time features
-        hour_sin = np.sin(2 * np.pi * hour / 24)
-        hour_cos = np.cos(2 * np.pi * hour / 24)
-        day_sin = np.sin(2 * np.pi * day_of_week / 7)
-        day_cos = np.cos(2 * np.pi * day_of_week / 7)
+        hour_sin, hour_cos = _HOUR_TRIG[current_time.hour]
+        day_sin, day_cos = _DOW_TRIG[current_time.weekday()]
         
-        temporal_features.extend([hour_sin, hour_cos, day_sin, day_cos])
+        temporal_features = [hour_sin, hour_cos, day_sin, day_cos]
+        self._temporal_cache = (now, temporal_features)
         
         return temporal_features
     
     def _apply_attention_weights(self, features: np.ndarray) -> np.ndarray:
         """Apply attention weights to features for better learning"""
-        if not self.attention_weights:
+        weights = self._attention_arr
+        if weights is None or weights.shape != features.shape:
             return features
         
         # Apply learned attention weights
-        weights = np.array(list(self.attention_weights.values()))
-        if len(weights) == len(features):
-            return features * weights
-        else:
-            return features
+        return features * weights
     
     def train_ensemble_model(self, training_data: List[Dict[str, Any]]) -> bool:
         """
@@ -256,65 +468,72 @@ class AdvancedAnomalyDetector:
             self.logger.info("Training advanced ensemble model...")
             
             # Prepare training data
-            X = []
-            y = []
-            
-            for data in training_data:
-                features = self.prepare_advanced_features(
-                    data.get('host_metrics', {}),
-                    data.get('network_metrics', {})
-                )
-                X.append(features)
-                
-                # Label: 0 for normal, 1 for anomaly
-                is_anomaly = data.get('is_anomaly', False)
-                y.append(1 if is_anomaly else 0)
+            X = self.prepare_advanced_features_batch([
+                (data.get('host_metrics', {}), data.get('network_metrics', {}))
+                for data in training_data
+            ])
             
-            X = np.array(X)
-            y = np.array(y)
+            # Label: 0 for normal, 1 for anomaly
+            y = np.array([1 if data.get('is_anomaly', False) else 0 for data in training_data])
             
-            # Scale features
+            # Scale features (fresh scaler: a loaded one may be shared via _MODEL_CACHE)
+            self.scaler = StandardScaler()
             X_scaled = self.scaler.fit_transform(X)
+            self._cache_scaler_params()
             
-            # Train multiple models
-            self.logger.info("Training Isolation Forest...")
+            # Build every model first; their fits are independent given
+            # X_scaled and y, so they run concurrently below. The forests are
+            # single-threaded: the parallel fit already keeps every CPU busy
             self.isolation_forest = IsolationForest(
                 contamination=0.01,  # 1% data dianggap anomali (lebih konservatif)
                 random_state=42,
-                n_estimators=100
+                n_estimators=100,
+                n_jobs=1
             )
-            self.isolation_forest.fit(X_scaled)
-            
-            self.logger.info("Training K-Means...")
             self.kmeans = KMeans(n_clusters=5, random_state=42, n_init=10)
-            self.kmeans.fit(X_scaled)
-            
-            self.logger.info("Training DBSCAN...")
             self.dbscan = DBSCAN(eps=0.5, min_samples=5)
-            self.dbscan.fit(X_scaled)
             
-            self.logger.info("Training Random Forest...")
+            # Density lookup used instead of re-running DBSCAN per prediction:
+            # a new point is dense if it has min_samples - 1 training neighbours
+            # within eps (DBSCAN counts the point itself)
+            self.dbscan_neighbors = NearestNeighbors(
+                n_neighbors=min(max(self.dbscan.min_samples - 1, 1), len(X_scaled))
+            )
+            
             self.random_forest = RandomForestClassifier(
                 n_estimators=100,
                 random_state=42,
-                max_depth=10
+                max_depth=10,
+                n_jobs=1
             )
-            self.random_forest.fit(X_scaled, y)
-            
-            self.logger.info("Training MLP Classifier...")
             self.mlp_classifier = MLPClassifier(
                 hidden_layer_sizes=(100, 50),
                 random_state=42,
-                max_iter=500
+                max_iter=500,
+                early_stopping=len(X_scaled) >= _MLP_EARLY_STOPPING_MIN_SAMPLES,
+                validation_fraction=0.1,
+                n_iter_no_change=10,
+                tol=1e-4
             )
-            self.mlp_classifier.fit(X_scaled, y)
-            
-            self.logger.info("Training Logistic Regression...")
             self.logistic_regression = LogisticRegression(
                 random_state=42,
                 max_iter=1000
             )
-            self.logistic_regression.fit(X_scaled, y)
+            
+            jobs = [('isolation_forest', None), ('kmeans', None), ('dbscan_neighbors', None)]
+            if self.train_dbscan:
+                jobs.append(('dbscan', None))
+            jobs += [(name, y) for name in ('random_forest', 'mlp_classifier', 'logistic_regression')]
+            
+            self.logger.info(f"Training {', '.join(name for name, _ in jobs)} in parallel...")
+            # Threads: the fits spend their time in native code that releases
+            # the GIL, and nothing has to be pickled to or from workers
+            fitted = joblib.Parallel(n_jobs=min(len(jobs), os.cpu_count() or 1), prefer='threads')(
+                joblib.delayed(_fit_estimator)(getattr(self, name), X_scaled, target)
+                for name, target in jobs
+            )
+            for (name, _), estimator in zip(jobs, fitted):
+                setattr(self, name, estimator)
             
             # Calculate feature importance
             self._calculate_feature_importance(X_scaled, y)
@@ -334,6 +553,32 @@ class AdvancedAnomalyDetector:
             self.logger.error(f"Error training ensemble model: {e}")
             return False
     
+    def _supervised_probabilities(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Anomaly probabilities of RF, MLP and LR, one column per model (float64)"""
+        return np.column_stack([
+            model.predict_proba(features_scaled)[:, 1]
+            for model in (self.random_forest, self.mlp_classifier, self.logistic_regression)
+        ]).astype(np.float64, copy=False)
+    
+    def _cache_scaler_params(self):
+        """Keep the fitted scaler statistics for _scale"""
+        mean = getattr(self.scaler, 'mean_', None)
+        scale = getattr(self.scaler, 'scale_', None)
+        # float32 like the features, so scaling does not upcast them
+        self._scaler_mean = None if mean is None else np.asarray(mean, dtype=np.float32)
+        self._scaler_scale = None if scale is None else np.asarray(scale, dtype=np.float32)
+    
+    def _scale(self, features: np.ndarray) -> np.ndarray:
+        """StandardScaler.transform without sklearn's per-call input validation"""
+        if self._scaler_mean is None or self._scaler_scale is None:
+            return self.scaler.transform(features)
+        if features.shape[-1] != self._scaler_mean.shape[0]:
+            raise ValueError(
+                f"X has {features.shape[-1]} features, but the scaler was fitted "
+                f"with {self._scaler_mean.shape[0]} features"
+            )
+        return (features - self._scaler_mean) / self._scaler_scale
+    
     def _calculate_feature_importance(self, X: np.ndarray, y: np.ndarray):
         """Calculate feature importance for explainability"""
         if self.random_forest is not None:
@@ -352,9 +597,12 @@ class AdvancedAnomalyDetector:
         }
     
     def detect_advanced_anomaly(self, host_metrics: Dict[str, Any], 
-                               network_metrics: Dict[str, Any]) -> Dict[str, Any]:
+                               network_metrics: Dict[str, Any],
+                               include_explanation: bool = True) -> Dict[str, Any]:
         """
         Advanced anomaly detection with ensemble methods and explainability
+        Pass include_explanation=False to skip the explanation text and the
+        feature importance / attention weights in the result
         """
         if not self.is_trained:
             return {
@@ -368,102 +616,58 @@ class AdvancedAnomalyDetector:
             # Prepare features
             features = self.prepare_advanced_features(host_metrics, network_metrics)
             # Ensure consistent data type
-            features = np.array(features, dtype=np.float64)
-            features_scaled = self.scaler.transform(features.reshape(1, -1))
-            
-            # Ensemble predictions
-            predictions = {}
-            scores = {}
+            features = np.asarray(features, dtype=np.float32)
+            features_scaled = self._scale(features.reshape(1, -1))
             
-            # Isolation Forest
-            if_anomaly = self.isolation_forest.predict(features_scaled)[0]
+            # Isolation Forest (predict() == -1 exactly when decision_function < 0)
             if_score = self.isolation_forest.decision_function(features_scaled)[0]
-            predictions['isolation_forest'] = if_anomaly == -1
-            scores['isolation_forest'] = max(0, (if_score + 0.5) * 100)
             
-            # K-Means
-            cluster = self.kmeans.predict(features_scaled)[0]
-            distance_to_center = np.linalg.norm(
-                features_scaled - self.kmeans.cluster_centers_[cluster]
-            )
-            max_distance = np.max([
-                np.linalg.norm(features_scaled - center) 
-                for center in self.kmeans.cluster_centers_
-            ])
+            # K-Means (distances to all centers in one pass; nearest = assigned cluster)
+            center_distances = np.linalg.norm(
+                self.kmeans.cluster_centers_ - features_scaled, axis=1
+            ).astype(np.float64)
+            cluster = int(np.argmin(center_distances))
+            distance_to_center = center_distances[cluster]
+            max_distance = center_distances.max()
             kmeans_score = (distance_to_center / max_distance) * 100 if max_distance > 0 else 0
-            predictions['kmeans'] = kmeans_score > 70
-            scores['kmeans'] = kmeans_score
-            
-            # DBSCAN
-            dbscan_label = self.dbscan.fit_predict(features_scaled)[0]
-            predictions['dbscan'] = dbscan_label == -1
-            scores['dbscan'] = 80 if dbscan_label == -1 else 20
-            
-            # Random Forest
-            rf_pred = self.random_forest.predict(features_scaled)[0]
-            rf_score = self.random_forest.predict_proba(features_scaled)[0][1] * 100
-            predictions['random_forest'] = rf_pred == 1
-            scores['random_forest'] = rf_score
-            
-            # MLP Classifier
-            mlp_pred = self.mlp_classifier.predict(features_scaled)[0]
-            mlp_score = self.mlp_classifier.predict_proba(features_scaled)[0][1] * 100
-            predictions['mlp'] = mlp_pred == 1
-            scores['mlp'] = mlp_score
-            
-            # Logistic Regression
-            lr_pred = self.logistic_regression.predict(features_scaled)[0]
-            lr_score = self.logistic_regression.predict_proba(features_scaled)[0][1] * 100
-            predictions['logistic_regression'] = lr_pred == 1
-            scores['logistic_regression'] = lr_score
-            
-            # Ensemble decision
-            anomaly_votes = sum(predictions.values())
-            total_models = len(predictions)
-            ensemble_score = np.mean(list(scores.values()))
-            
-            # Weighted ensemble (give more weight to better performing models)
-            weights = {
-                'isolation_forest': 0.25,
-                'kmeans': 0.15,
-                'dbscan': 0.15,
-                'random_forest': 0.20,
-                'mlp': 0.15,
-                'logistic_regression': 0.10
-            }
-            
-            weighted_score = sum(scores[model] * weights[model] for model in scores)
             
-            # Final decision
-            is_anomaly = anomaly_votes >= (total_models * 0.8)  # 80% consensus required
-            final_score = weighted_score
-            
-            # Generate explanation
-            explanation = self._generate_explanation(
-                predictions, scores, features, host_metrics, network_metrics
+            # DBSCAN (density check against the training data)
+            if self.dbscan_neighbors is not None:
+                distances, _ = self.dbscan_neighbors.kneighbors(features_scaled)
+                dbscan_outlier = distances[0, -1] > self.dbscan.eps
+            else:
+                dbscan_outlier = True
+            
+            # Random Forest, MLP Classifier and Logistic Regression together;
+            # labels are the argmax of the probabilities, as predict() would return
+            with _blas_single_thread():
+                supervised_proba = self._supervised_probabilities(features_scaled)
+            rf_proba, mlp_proba, lr_proba = supervised_proba[0]
+            
+            # Ensemble votes and scores in _ENSEMBLE_MODELS order
+            votes = np.array([[
+                if_score < 0,
+                kmeans_score > 70,
+                dbscan_outlier,
+                rf_proba > 0.5,
+                mlp_proba > 0.5,
+                lr_proba > 0.5
+            ]])
+            scores = np.array([[
+                max(0, (if_score + 0.5) * 100),
+                kmeans_score,
+                80 if dbscan_outlier else 20,
+                rf_proba * 100,
+                mlp_proba * 100,
+                lr_proba * 100
+            ]], dtype=np.float64)
+            weighted_scores, anomaly_votes = _fuse_scores(scores, votes, _ENSEMBLE_WEIGHT_VECTOR)
+            
+            return self._ensemble_result(
+                votes[0], scores[0], weighted_scores[0], anomaly_votes[0],
+                features, host_metrics, network_metrics, include_explanation
             )
             
-            # Extract CPU and memory usage for monitoring display
-            cpu_usage = host_metrics.get('system', {}).get('cpu', {}).get('percent', 0)
-            memory_usage = host_metrics.get('system', {}).get('memory', {}).get('percent', 0)
-            
-            return {
-                "is_anomaly": is_anomaly,
-                "anomaly_score": final_score,
-                "confidence": min(100, final_score),
-                "explanation": explanation,
-                "cpu_usage": float(cpu_usage),
-                "memory_usage": float(memory_usage),
-                "ensemble_details": {
-                    "predictions": predictions,
-                    "scores": scores,
-                    "votes": f"{anomaly_votes}/{total_models}",
-                    "weighted_score": weighted_score
-                },
-                "feature_importance": self.feature_importance,
-                "attention_weights": self.attention_weights
-            }
-            
         except Exception as e:
             self.logger.error(f"Error in advanced anomaly detection: {e}")
             return {
@@ -473,6 +677,150 @@ class AdvancedAnomalyDetector:
                 "explanation": f"Error in detection: {str(e)}"
             }
     
+    def detect_advanced_anomaly_batch(self, samples: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                                      include_explanation: bool = True) -> List[Dict[str, Any]]:
+        """
+        Advanced anomaly detection for many (host_metrics, network_metrics) pairs
+        Samples are grouped by metric layout; each group is scaled once and
+        every ensemble model is evaluated once over the group
+        """
+        if not self.is_trained:
+            return [{
+                "is_anomaly": False,
+                "anomaly_score": 0.0,
+                "confidence": 0.0,
+                "explanation": "Model belum dilatih"
+            } for _ in samples]
+        
+        groups: Dict[Tuple[bool, bool, bool], List[int]] = {}
+        for i, (host_metrics, network_metrics) in enumerate(samples):
+            groups.setdefault(_feature_layout(host_metrics, network_metrics), []).append(i)
+        
+        results: List[Dict[str, Any]] = [None] * len(samples)
+        for indices in groups.values():
+            group_results = self._detect_layout_group([samples[i] for i in indices], include_explanation)
+            for i, result in zip(indices, group_results):
+                results[i] = result
+        return results
+    
+    def _detect_layout_group(self, samples: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                             include_explanation: bool) -> List[Dict[str, Any]]:
+        """Batched ensemble scoring for samples sharing one metric layout"""
+        try:
+            features = self.prepare_advanced_features_batch(samples)
+            features_scaled = self._scale(features)
+            
+            # Isolation Forest (predict() == -1 exactly when decision_function < 0)
+            if_scores = self.isolation_forest.decision_function(features_scaled)
+            
+            # K-Means
+            center_distances = np.linalg.norm(
+                features_scaled[:, np.newaxis, :] - self.kmeans.cluster_centers_, axis=2
+            ).astype(np.float64)
+            max_distances = center_distances.max(axis=1)
+            nearest_distances = center_distances.min(axis=1)
+            kmeans_scores = np.divide(
+                nearest_distances * 100, max_distances,
+                out=np.zeros_like(nearest_distances), where=max_distances > 0
+            )
+            
+            # DBSCAN (density check against the training data)
+            if self.dbscan_neighbors is not None:
+                distances, _ = self.dbscan_neighbors.kneighbors(features_scaled)
+                dbscan_outliers = distances[:, -1] > self.dbscan.eps
+            else:
+                dbscan_outliers = np.ones(len(samples), dtype=bool)
+            
+            # Supervised models: labels derived from the probabilities
+            # (predict() is the argmax of predict_proba)
+            supervised_proba = self._supervised_probabilities(features_scaled)
+            
+            # Ensemble votes and scores, one row per sample in _ENSEMBLE_MODELS order
+            votes = np.column_stack([
+                if_scores < 0,
+                kmeans_scores > 70,
+                dbscan_outliers,
+                supervised_proba > 0.5
+            ])
+            scores = np.column_stack([
+                np.maximum(0, (if_scores + 0.5) * 100),
+                kmeans_scores,
+                np.where(dbscan_outliers, 80.0, 20.0),
+                supervised_proba * 100
+            ])
+            weighted_scores, anomaly_votes = _fuse_scores(scores, votes, _ENSEMBLE_WEIGHT_VECTOR)
+            
+            return [
+                self._ensemble_result(
+                    votes[i], scores[i], weighted_scores[i], anomaly_votes[i],
+                    features[i], host_metrics, network_metrics, include_explanation
+                )
+                for i, (host_metrics, network_metrics) in enumerate(samples)
+            ]
+            
+        except Exception as e:
+            self.logger.error(f"Error in batch anomaly detection, falling back to per-sample: {e}")
+            return [
+                self.detect_advanced_anomaly(host_metrics, network_metrics, include_explanation)
+                for host_metrics, network_metrics in samples
+            ]
+    
+    def detect_batch(self, events: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                     include_explanation: bool = True) -> List[Dict[str, Any]]:
+        """
+        Bulk counterpart of detect_advanced_anomaly for pipelines handling many hosts
+        Returns one result per (host_metrics, network_metrics) event, in order
+        """
+        return self.detect_advanced_anomaly_batch(events, include_explanation)
+    
+    def _ensemble_result(self, votes: np.ndarray, scores: np.ndarray, weighted_score: float,
+                         anomaly_votes: int, features: np.ndarray,
+                         host_metrics: Dict, network_metrics: Dict,
+                         include_explanation: bool = True) -> Dict[str, Any]:
+        """Build the detection result from one row of ensemble votes and scores"""
+        # Per-model output, keyed by model name
+        predictions = dict(zip(_ENSEMBLE_MODELS, votes.tolist()))
+        scores = dict(zip(_ENSEMBLE_MODELS, scores.tolist()))
+        
+        # Ensemble decision
+        anomaly_votes = int(anomaly_votes)
+        total_models = len(_ENSEMBLE_MODELS)
+        weighted_score = float(weighted_score)
+        
+        # Final decision
+        is_anomaly = anomaly_votes >= (total_models * 0.8)  # 80% consensus required
+        final_score = weighted_score
+        
+        ensemble_details = {
+            "predictions": predictions,
+            "scores": scores,
+            "votes": f"{anomaly_votes}/{total_models}",
+            "weighted_score": weighted_score
+        }
+        
+        # Extract CPU and memory usage for monitoring display
+        cpu_usage = host_metrics.get('system', {}).get('cpu', {}).get('percent', 0)
+        memory_usage = host_metrics.get('system', {}).get('memory', {}).get('percent', 0)
+        
+        result = {
+            "is_anomaly": is_anomaly,
+            "anomaly_score": final_score,
+            "confidence": min(100, final_score),
+            "cpu_usage": float(cpu_usage),
+            "memory_usage": float(memory_usage),
+            "ensemble_details": ensemble_details
+        }
+        
+        if include_explanation:
+            # Generate explanation
+            result["explanation"] = self._generate_explanation(
+                predictions, scores, features, host_metrics, network_metrics
+            )
+            result["feature_importance"] = self.feature_importance
+            result["attention_weights"] = self.attention_weights
+        
+        return result
+    
     def _generate_explanation(self, predictions: Dict, scores: Dict, 
                            features: np.ndarray, host_metrics: Dict, 
                            network_metrics: Dict) -> str:
@@ -492,10 +840,9 @@ class AdvancedAnomalyDetector:
         
         explanations.append(f"Top contributing models: {', '.join([f'{model} ({score:.1f}%)' for model, score in top_models])}")
         
-        # Feature importance
+        # Feature importance (static between trainings, so the text is cached)
         if self.feature_importance:
-            top_features = sorted(self.feature_importance.items(), key=lambda x: x[1], reverse=True)[:3]
-            explanations.append(f"Most important features: {', '.join([f'Feature {idx} ({imp:.3f})' for idx, imp in top_features])}")
+            explanations.append(self._top_features_text())
         
         # System metrics explanation
         if 'system' in host_metrics:
@@ -511,6 +858,15 @@ class AdvancedAnomalyDetector:
         
         return " | ".join(explanations)
     
+    def _top_features_text(self) -> str:
+        """Explanation text of the three most important features"""
+        cached_for, text = self._top_features_cache
+        if cached_for is not self.feature_importance:
+            top_features = sorted(self.feature_importance.items(), key=lambda x: x[1], reverse=True)[:3]
+            text = f"Most important features: {', '.join([f'Feature {idx} ({imp:.3f})' for idx, imp in top_features])}"
+            self._top_features_cache = (self.feature_importance, text)
+        return text
+    
     def save_models(self):
         """Save all trained models"""
         try:
@@ -518,6 +874,7 @@ class AdvancedAnomalyDetector:
                 'isolation_forest': self.isolation_forest,
                 'kmeans': self.kmeans,
                 'dbscan': self.dbscan,
+                'dbscan_neighbors': self.dbscan_neighbors,
                 'random_forest': self.random_forest,
                 'mlp_classifier': self.mlp_classifier,
                 'logistic_regression': self.logistic_regression,
@@ -525,8 +882,12 @@ class AdvancedAnomalyDetector:
             }
             
             for name, model in models_to_save.items():
+                model_file = f"{self.model_path}/{name}.pkl"
                 if model is not None:
-                    joblib.dump(model, f"{self.model_path}/{name}.pkl")
+                    # Write aside and rename: other processes may have the old
+                    # file memory-mapped, truncating it in place would break them
+                    joblib.dump(model, f"{model_file}.tmp")
+                    os.replace(f"{model_file}.tmp", model_file)
             
             # Save metadata
             metadata = {
@@ -539,6 +900,8 @@ class AdvancedAnomalyDetector:
             with open(f"{self.model_path}/advanced_metadata.json", 'w') as f:
                 json.dump(metadata, f, indent=2)
             
+            _MODEL_CACHE.pop(os.path.abspath(self.model_path), None)
+            
             self.logger.info("Advanced models saved successfully")
             
         except Exception as e:
@@ -548,24 +911,45 @@ class AdvancedAnomalyDetector:
         """Load all trained models"""
         try:
             models_to_load = [
-                'isolation_forest', 'kmeans', 'dbscan', 'random_forest',
+                'isolation_forest', 'kmeans', 'dbscan', 'dbscan_neighbors', 'random_forest',
                 'mlp_classifier', 'logistic_regression', 'scaler'
             ]
             
-            for name in models_to_load:
-                model_path = f"{self.model_path}/{name}.pkl"
-                if os.path.exists(model_path):
-                    model = joblib.load(model_path)
-                    setattr(self, name, model)
-            
-            # Load metadata
             metadata_path = f"{self.model_path}/advanced_metadata.json"
-            if os.path.exists(metadata_path):
-                with open(metadata_path, 'r') as f:
-                    metadata = json.load(f)
-                    self.is_trained = metadata.get('is_trained', False)
-                    self.feature_importance = metadata.get('feature_importance', {})
-                    self.attention_weights = metadata.get('attention_weights', {})
+            model_paths = {name: f"{self.model_path}/{name}.pkl" for name in models_to_load}
+            
+            # Reuse the models already loaded in this process unless a file changed
+            cache_key = os.path.abspath(self.model_path)
+            mtime = max(
+                (os.path.getmtime(path) for path in [*model_paths.values(), metadata_path]
+                 if os.path.exists(path)),
+                default=0.0
+            )
+            cached = _MODEL_CACHE.get(cache_key)
+            
+            if cached is not None and cached[0] == mtime:
+                loaded = cached[1]
+            else:
+                loaded = {}
+                # Arrays are memory-mapped read-only, so worker processes
+                # loading the same files share their pages instead of copying
+                for name, model_path in model_paths.items():
+                    if os.path.exists(model_path):
+                        loaded[name] = joblib.load(model_path, mmap_mode='r')
+                
+                # Load metadata
+                if os.path.exists(metadata_path):
+                    with open(metadata_path, 'r') as f:
+                        metadata = json.load(f)
+                        loaded['is_trained'] = metadata.get('is_trained', False)
+                        loaded['feature_importance'] = metadata.get('feature_importance', {})
+                        loaded['attention_weights'] = metadata.get('attention_weights', {})
+                
+                _MODEL_CACHE[cache_key] = (mtime, loaded)
+            
+            for name, value in loaded.items():
+                setattr(self, name, value)
+            self._cache_scaler_params()
             
             self.logger.info("Advanced models loaded successfully")
             return self.is_trained
@@ -6,7 +6,7 @@ dan K-Means Clustering
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import silhouette_score
 import joblib
@@ -15,12 +15,122 @@ import os
 from datetime import datetime
 from typing import Dict, List, Any, Tuple
 import logging
+import logging.handlers
+import queue
+import atexit
+
+from . import scoring_kernels
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Pengganti no-op untuk numba.njit jika numba tidak terpasang"""
+        def decorator(func):
+            return func
+        return decorator
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Jumlah fitur tetap per sampel (kolom setelah fitur jaringan berisi padding nol)
+_FEATURE_COUNT = 31
+
+# Nama fitur sesuai urutan kolom prepare_features (tanpa kolom padding)
+_FEATURE_NAMES = (
+    "CPU Usage", "Memory Usage", "Disk Usage",
+    "Network Sent (MB)", "Network Received (MB)",
+    "Process Count", "Suspicious Processes",
+    "Max CPU Process", "Max Memory Process",
+    "Modified Critical Files", "Network Connections",
+    "Total Events", "Alert Events", "Foreign Connections",
+    "Unique Source IPs", "Unique Dest IPs", "Unique Ports",
+    "Suspicious Patterns", "Network Anomaly Score"
+)
+
+# Indikator untuk _generate_explanation: (indeks fitur, ambang, format pesan,
+# nilai ditampilkan sebagai int); pesan muncul jika nilai fitur > ambang
+_EXPLAIN_TABLE = tuple(
+    (i, 80, f"{name} sangat tinggi: {{:.1f}}%", False)
+    for i, name in enumerate(_FEATURE_NAMES[:5])  # Metrik sistem
+) + (
+    (5, 200, "Terlalu banyak proses: {}", True),
+    (6, 0, "Proses mencurigakan: {}", True),
+    (9, 0, "File kritis dimodifikasi: {}", True),
+    (10, 50, "Banyak koneksi jaringan: {}", True),
+    (13, 10, "Banyak koneksi asing: {}", True),
+)
+
+# Ambang per kolom fitur (NaN = tanpa ambang) dan pesan per indeks dari _EXPLAIN_TABLE
+_EXPLAIN_THRESHOLDS = np.full(_FEATURE_COUNT, np.nan)
+_EXPLAIN_THRESHOLDS[[row[0] for row in _EXPLAIN_TABLE]] = [row[1] for row in _EXPLAIN_TABLE]
+_EXPLAIN_MESSAGES = {index: (template, as_int) for index, _, template, as_int in _EXPLAIN_TABLE}
+
+# Skor Isolation Forest baru diparalelkan antar thread mulai ukuran batch ini;
+# untuk batch kecil overhead thread lebih besar dari hasilnya
+_PARALLEL_SCORE_MIN_SAMPLES = 1000
+
+# Array pohon Isolation Forest, masing-masing disimpan sebagai iforest_<nama>.npy
+# ('params' berisi [offset_, penyebut skor])
+_IFOREST_ARRAYS = (
+    'feature', 'threshold', 'children_left', 'children_right',
+    'leaf_depth', 'tree_offsets', 'params'
+)
+
+
+def _average_path_length(n_samples_leaf: np.ndarray) -> np.ndarray:
+    """Rata-rata panjang path di pohon biner dengan n sampel, c(n) pada paper iForest"""
+    n = np.asarray(n_samples_leaf, dtype=np.float64)
+    result = np.zeros_like(n)
+    result[n == 2] = 1.0
+    mask = n > 2
+    result[mask] = 2.0 * (np.log(n[mask] - 1.0) + np.euler_gamma) - 2.0 * (n[mask] - 1.0) / n[mask]
+    return result
+
+
+def _jsonize(obj: Any) -> Any:
+    """Konversi skalar numpy yang tidak didukung json"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _save_array(path: str, array: np.ndarray):
+    """Tulis array .npy lewat file sementara agar file yang sedang di-mmap tidak terpotong"""
+    with open(f"{path}.tmp", 'wb') as f:
+        np.save(f, array)
+    os.replace(f"{path}.tmp", path)
+
+
+def _save_estimator(path: str, estimator: Any):
+    """Tulis estimator sklearn (.pkl) lewat file sementara, seperti _save_array"""
+    joblib.dump(estimator, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+
+# Kernel skor: versi AOT jika modul anomaly_kernels sudah dibangun
+# (python -m src.ml_models.build_kernels), selain itu JIT numba dari scoring_kernels
+try:
+    from .anomaly_kernels import score_kernel as _score_kernel, iforest_depths as _iforest_depths
+    AOT_KERNELS_AVAILABLE = True
+except ImportError:
+    AOT_KERNELS_AVAILABLE = False
+    _score_kernel = njit(fastmath=True, cache=True)(scoring_kernels.score_kernel)
+    # nogil: potongan batch besar diskor paralel dengan thread
+    _iforest_depths = njit(nogil=True, cache=True)(scoring_kernels.iforest_depths)
 
 class AnomalyDetector:
     """Kelas untuk deteksi anomali menggunakan multiple ML algorithms"""
     
-    def __init__(self, model_path: str = "models/"):
+    def __init__(self, model_path: str = "models/", n_jobs: int = -1):
         self.model_path = model_path
+        self.n_jobs = n_jobs  # Thread untuk training dan skor batch besar
         self.logger = self._setup_logger()
         self.scaler = StandardScaler()
         self.isolation_forest = None
@@ -28,6 +138,21 @@ class AnomalyDetector:
         self.feature_columns = []
         self.is_trained = False
         
+        # Statistik scaler yang sudah di-fit untuk transformasi inline (lihat _scale)
+        self._scaler_mean = None
+        self._scaler_scale = None
+        
+        # Center K-Means, transposnya dan norma kuadratnya untuk jarak via GEMM
+        self._centers = None
+        self._centers_T = None
+        self._centers_sqnorm = None
+        
+        # Array pohon Isolation Forest (lihat _IFOREST_ARRAYS), dipakai untuk skor
+        self._iforest = None
+        
+        # Kompilasi kernel skor sekarang agar deteksi pertama tidak menunggu JIT
+        _score_kernel(np.zeros(1, dtype=np.float32), np.zeros((1, 1), dtype=np.float32), 0.0)
+        
         # Buat direktori model jika belum ada
         os.makedirs(model_path, exist_ok=True)
     
@@ -36,97 +161,104 @@ class AnomalyDetector:
         logger = logging.getLogger('AnomalyDetector')
         logger.setLevel(logging.INFO)
         
-        handler = logging.FileHandler('logs/anomaly_detector.log')
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        # Logger dipakai bersama semua instance; handler cukup dipasang sekali
+        if not logger.handlers:
+            handler = logging.FileHandler('logs/anomaly_detector.log')
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            handler.setFormatter(formatter)
+            
+            # Penulisan file dilakukan thread listener, di luar jalur deteksi
+            log_queue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(log_queue, handler)
+            listener.start()
+            atexit.register(listener.stop)
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
         
         return logger
     
     def prepare_features(self, host_metrics: Dict[str, Any], 
                         network_metrics: Dict[str, Any]) -> np.ndarray:
-        """Siapkan fitur untuk model ML dari data host dan jaringan"""
-        features = []
-        
+        """Siapkan fitur untuk model ML dari data host dan jaringan (array baru (31,) float32)"""
+        row = np.zeros(_FEATURE_COUNT, dtype=np.float32)
+        self._fill_features(row, host_metrics, network_metrics)
+        return row
+    
+    def _fill_features(self, row: np.ndarray, host_metrics: Dict[str, Any],
+                       network_metrics: Dict[str, Any]):
+        """Tulis fitur satu sampel ke row (baris (31,) milik pemanggil, sudah berisi nol)"""
         # Fitur dari host metrics
         # Always use the same structure - normalize to training data structure
         system = host_metrics.get('system', host_metrics)  # Use system if available, otherwise use host_metrics directly
-        features.extend([
-            system.get('cpu', {}).get('percent', 0),
-            system.get('memory', {}).get('percent', 0),
-            system.get('disk', {}).get('percent', 0),
-            system.get('network', {}).get('bytes_sent', 0) / 1000000,  # MB
-            system.get('network', {}).get('bytes_recv', 0) / 1000000,  # MB
-        ])
-        
-        # Fitur dari proses
+        network = system.get('network', {})
+        row[0] = system.get('cpu', {}).get('percent', 0)
+        row[1] = system.get('memory', {}).get('percent', 0)
+        row[2] = system.get('disk', {}).get('percent', 0)
+        row[3] = network.get('bytes_sent', 0) / 1000000  # MB
+        row[4] = network.get('bytes_recv', 0) / 1000000  # MB
+        
+        # Fitur dari proses, dihitung dalam satu kali iterasi
         processes = host_metrics.get('processes', [])
-        features.extend([
-            len(processes),  # Jumlah proses
-            sum(1 for p in processes if p.get('is_suspicious', False)),  # Proses mencurigakan
-            max([p.get('cpu_percent', 0) for p in processes], default=0),  # CPU tertinggi
-            max([p.get('memory_percent', 0) for p in processes], default=0),  # Memory tertinggi
-        ])
+        suspicious = 0
+        max_cpu = 0
+        max_memory = 0
+        for p in processes:
+            if p.get('is_suspicious', False):
+                suspicious += 1
+            cpu = p.get('cpu_percent', 0)
+            if cpu > max_cpu:
+                max_cpu = cpu
+            memory = p.get('memory_percent', 0)
+            if memory > max_memory:
+                max_memory = memory
+        row[5] = len(processes)  # Jumlah proses
+        row[6] = suspicious  # Proses mencurigakan
+        row[7] = max_cpu  # CPU tertinggi
+        row[8] = max_memory  # Memory tertinggi
         
         # Fitur dari file kritis
         critical_files = host_metrics.get('critical_files', {})
-        modified_files = sum(1 for f in critical_files.values() 
-                           if f.get('exists') and f.get('modified'))
-        features.append(modified_files)
+        row[9] = sum(1 for f in critical_files.values() 
+                     if f.get('exists') and f.get('modified'))
         
         # Fitur dari koneksi jaringan
-        network_connections = host_metrics.get('network_connections', [])
-        features.append(len(network_connections))
+        row[10] = len(host_metrics.get('network_connections', []))
         
         # Fitur dari network metrics
         network_features = network_metrics.get('features', {})
-        features.extend([
-            network_features.get('total_events', 0),
-            network_features.get('alert_events', 0),
-            network_features.get('foreign_connections', 0),
-            len(network_features.get('unique_src_ips', [])),
-            len(network_features.get('unique_dst_ips', [])),
-            len(network_features.get('unique_ports', [])),
-            len(network_features.get('suspicious_patterns', [])),
-        ])
+        row[11] = network_features.get('total_events', 0)
+        row[12] = network_features.get('alert_events', 0)
+        row[13] = network_features.get('foreign_connections', 0)
+        row[14] = len(network_features.get('unique_src_ips', []))
+        row[15] = len(network_features.get('unique_dst_ips', []))
+        row[16] = len(network_features.get('unique_ports', []))
+        row[17] = len(network_features.get('suspicious_patterns', []))
         
         # Fitur tambahan dari network anomaly score
-        features.append(network_metrics.get('anomaly_score', 0))
+        row[18] = network_metrics.get('anomaly_score', 0)
         
-        # Pad features to ensure consistent feature count (31 features)
-        while len(features) < 31:
-            features.append(0.0)
-        
-        # Ensure consistent data type and convert to float64
-        features_array = np.array(features, dtype=np.float64).reshape(1, -1)
-        return features_array
+        # Kolom 19-30 tetap nol sebagai padding (31 fitur)
     
     def train_baseline_model(self, training_data: List[Dict[str, Any]]) -> bool:
         """Latih model dengan data baseline normal"""
         try:
             self.logger.info("Memulai pelatihan model baseline...")
             
-            # Siapkan data training
-            X = []
-            for data_point in training_data:
+            # Siapkan data training (float32 untuk scaler, K-Means dan Isolation Forest)
+            X = np.zeros((len(training_data), _FEATURE_COUNT), dtype=np.float32)
+            for row, data_point in zip(X, training_data):
                 host_metrics = data_point.get('host_metrics', {})
                 network_metrics = data_point.get('network_metrics', {})
-                features = self.prepare_features(host_metrics, network_metrics)
-                X.append(features.flatten())
-            
-            X = np.array(X)
+                self._fill_features(row, host_metrics, network_metrics)
             
             if len(X) < 10:
                 self.logger.error("Data training tidak cukup (minimal 10 sampel)")
                 return False
             
-            # Ensure consistent data type
-            X = np.array(X, dtype=np.float64)
-            
             # Normalisasi fitur
             X_scaled = self.scaler.fit_transform(X)
+            self._cache_scaler_params()
             
             # Simpan nama kolom fitur
             self.feature_columns = [f"feature_{i}" for i in range(X.shape[1])]
@@ -135,18 +267,22 @@ class AnomalyDetector:
             self.isolation_forest = IsolationForest(
                 contamination=0.01,  # 1% data dianggap anomali (lebih konservatif)
                 random_state=42,
-                n_estimators=100
+                n_estimators=50,
+                max_samples=min(256, len(X_scaled)),  # Ukuran subsampel optimal iForest
+                n_jobs=self.n_jobs
             )
             self.isolation_forest.fit(X_scaled)
+            self._export_isolation_forest()
             
             # Latih K-Means untuk clustering
             # Tentukan jumlah cluster optimal
             best_k = self._find_optimal_clusters(X_scaled)
             self.kmeans = KMeans(n_clusters=best_k, random_state=42)
             self.kmeans.fit(X_scaled)
+            self._cache_centers(self.kmeans.cluster_centers_)
             
             self.is_trained = True
-            self.logger.info(f"Model berhasil dilatih dengan {len(X)} sampel")
+            self.logger.info("Model berhasil dilatih dengan %d sampel", len(X))
             
             # Simpan model
             self.save_models()
@@ -154,9 +290,101 @@ class AnomalyDetector:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error training model: {e}")
+            self.logger.error("Error training model: %s", e)
             return False
     
+    def _cache_scaler_params(self):
+        """Simpan mean/scale scaler yang sudah di-fit untuk _scale"""
+        mean = getattr(self.scaler, 'mean_', None)
+        scale = getattr(self.scaler, 'scale_', None)
+        # float32 seperti fitur, agar skala tidak meng-upcast fitur
+        self._scaler_mean = None if mean is None else np.asarray(mean, dtype=np.float32)
+        self._scaler_scale = None if scale is None else np.asarray(scale, dtype=np.float32)
+    
+    def _scale(self, features: np.ndarray) -> np.ndarray:
+        """StandardScaler.transform tanpa validasi input sklearn di setiap pemanggilan"""
+        if self._scaler_mean is None or self._scaler_scale is None:
+            return self.scaler.transform(features)
+        if features.shape[-1] != self._scaler_mean.shape[0]:
+            raise ValueError(
+                f"X has {features.shape[-1]} features, but the scaler was fitted "
+                f"with {self._scaler_mean.shape[0]} features"
+            )
+        return (features - self._scaler_mean) / self._scaler_scale
+    
+    def _cache_centers(self, centers: np.ndarray):
+        """Simpan center K-Means dalam bentuk siap pakai untuk perhitungan jarak"""
+        self._centers = np.ascontiguousarray(centers, dtype=np.float32)
+        self._centers_T = np.ascontiguousarray(self._centers.T)
+        self._centers_sqnorm = np.einsum('ij,ij->i', self._centers, self._centers)
+    
+    def _export_isolation_forest(self):
+        """Ratakan pohon Isolation Forest terlatih menjadi array gabungan (_iforest)"""
+        forest = self.isolation_forest
+        parts = {name: [] for name in _IFOREST_ARRAYS[:5]}
+        tree_offsets = [0]
+        
+        for estimator, features in zip(forest.estimators_, forest.estimators_features_):
+            tree = estimator.tree_
+            base = tree_offsets[-1]
+            internal = tree.children_left != -1
+            
+            # Indeks fitur pohon mengacu ke subset fitur jika fitur disubsampel
+            feature = tree.feature.astype(np.int64)
+            if len(features) < forest.n_features_in_:
+                feature[internal] = np.asarray(features)[feature[internal]]
+            
+            parts['feature'].append(feature)
+            parts['threshold'].append(tree.threshold)
+            parts['children_left'].append(np.where(internal, tree.children_left + base, -1))
+            parts['children_right'].append(np.where(internal, tree.children_right + base, -1))
+            # Kontribusi daun ke kedalaman: depth + c(n_node_samples) - 1
+            parts['leaf_depth'].append(
+                tree.compute_node_depths() + _average_path_length(tree.n_node_samples) - 1.0
+            )
+            tree_offsets.append(base + tree.node_count)
+        
+        iforest = {
+            name: np.ascontiguousarray(np.concatenate(arrays))
+            for name, arrays in parts.items()
+        }
+        iforest['children_left'] = iforest['children_left'].astype(np.int64)
+        iforest['children_right'] = iforest['children_right'].astype(np.int64)
+        iforest['tree_offsets'] = np.asarray(tree_offsets, dtype=np.int64)
+        denominator = len(forest.estimators_) * _average_path_length([forest.max_samples_])[0]
+        iforest['params'] = np.array([forest.offset_, denominator], dtype=np.float64)
+        self._iforest = iforest
+    
+    def _iforest_decision_function(self, X: np.ndarray) -> np.ndarray:
+        """IsolationForest.decision_function dihitung dari array pohon _iforest"""
+        # Tanpa numba maupun modul AOT, penelusuran pohon berjalan sebagai Python
+        # murni dan jauh lebih lambat dari implementasi sklearn
+        if not (AOT_KERNELS_AVAILABLE or NUMBA_AVAILABLE) and self.isolation_forest is not None:
+            return self.isolation_forest.decision_function(X)
+        
+        trees = self._iforest
+        # Pohon sklearn membandingkan fitur dalam float32 (fitur sudah float32)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        arrays = (
+            trees['feature'], trees['threshold'], trees['children_left'],
+            trees['children_right'], trees['leaf_depth'], trees['tree_offsets']
+        )
+        
+        if len(X) >= _PARALLEL_SCORE_MIN_SAMPLES and joblib.effective_n_jobs(self.n_jobs) > 1:
+            # Kernel melepas GIL, jadi potongan baris bisa diskor paralel dengan thread
+            chunks = np.array_split(X, joblib.effective_n_jobs(self.n_jobs))
+            depths = np.concatenate(joblib.Parallel(n_jobs=self.n_jobs, prefer='threads')(
+                joblib.delayed(_iforest_depths)(chunk, *arrays) for chunk in chunks
+            ))
+        else:
+            depths = _iforest_depths(X, *arrays)
+        
+        offset, denominator = trees['params']
+        scores = 2 ** -np.divide(
+            depths, denominator, out=np.ones_like(depths), where=denominator != 0
+        )
+        return -scores - offset
+    
     def _find_optimal_clusters(self, X: np.ndarray) -> int:
         """Tentukan jumlah cluster optimal menggunakan silhouette score"""
         if len(X) < 4:
@@ -166,11 +394,14 @@ class AnomalyDetector:
         best_k = 2
         best_score = -1
         
+        # Silhouette dihitung pada subsampel agar tidak O(N^2) per k
+        sample_size = min(1000, len(X))
+        
         for k in range(2, max_clusters + 1):
             try:
-                kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+                kmeans = MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3, batch_size=256)
                 cluster_labels = kmeans.fit_predict(X)
-                score = silhouette_score(X, cluster_labels)
+                score = silhouette_score(X, cluster_labels, sample_size=sample_size, random_state=42)
                 
                 if score > best_score:
                     best_score = score
@@ -192,83 +423,33 @@ class AnomalyDetector:
             }
         
         try:
-            # Siapkan fitur
+            # Siapkan fitur (array lokal, aman dipanggil dari beberapa thread)
             features = self.prepare_features(host_metrics, network_metrics)
-            # Ensure consistent data type
-            features = np.array(features, dtype=np.float64)
             
             # Bypass ML model untuk sementara dan gunakan nilai sederhana
             try:
-                features_scaled = self.scaler.transform(features)
-                # Prediksi dengan Isolation Forest
-                if_anomaly = self.isolation_forest.predict(features_scaled)[0]
-                if_score = self.isolation_forest.decision_function(features_scaled)[0]
-                
-                # Prediksi dengan K-Means
-                cluster = self.kmeans.predict(features_scaled)[0]
-                distance_to_center = np.linalg.norm(
-                    features_scaled - self.kmeans.cluster_centers_[cluster]
-                )
+                features_scaled = self._scale(features)
+                # Prediksi dengan Isolation Forest (outlier jika skor < 0, seperti predict)
+                if_score = self._iforest_decision_function(features_scaled.reshape(1, -1))[0]
+                if_anomaly = -1 if if_score < 0 else 1
             except Exception as ml_error:
                 # Fallback ke deteksi sederhana jika ML model gagal
-                self.logger.warning(f"ML model error: {ml_error}, using simple detection")
+                self.logger.warning("ML model error: %s, using simple detection", ml_error)
                 if_anomaly = 1  # Normal
                 if_score = 0.0
-                cluster = 0
-                distance_to_center = 0.0
-            
-            # Hitung skor anomali gabungan
-            # Konversi if_score (semakin negatif = semakin anomali)
-            if_normalized = max(0, (if_score + 0.5) * 100)  # Normalisasi ke 0-100
             
-            # Hitung jarak dari cluster center (semakin jauh = semakin anomali)
-            distances = [
-                np.linalg.norm(features_scaled - center) 
-                for center in self.kmeans.cluster_centers_
-            ]
-            max_distance = np.max(distances) if len(distances) > 0 else 1.0
-            if max_distance > 0:
-                distance_normalized = (distance_to_center / max_distance) * 100
-            else:
-                distance_normalized = 0.0
-            
-            # Skor gabungan (rata-rata tertimbang)
-            combined_score = (if_normalized * 0.7) + (distance_normalized * 0.3)
-            
-            # Handle NaN values
-            if not isinstance(combined_score, (int, float)) or combined_score != combined_score:
-                combined_score = 0.0
-            
-            # Tentukan apakah anomali
-            is_anomaly = if_anomaly == -1 or combined_score > 85
-            
-            # Hitung confidence
-            confidence = min(100, combined_score)
-            
-            # Generate explanation
-            explanation = self._generate_explanation(
-                features, if_anomaly, combined_score, cluster
+            # Cluster K-Means, skor gabungan dan jarak ke center cluster (kernel numba)
+            combined_score, distance_to_center, cluster = _score_kernel(
+                features_scaled, self._centers, float(if_score)
             )
             
-            # Extract CPU and memory usage for monitoring display
-            # Always use the 'system' structure since that's what collect_all_metrics returns
-            cpu_usage = host_metrics.get('system', {}).get('cpu', {}).get('percent', 0)
-            memory_usage = host_metrics.get('system', {}).get('memory', {}).get('percent', 0)
-            
-            return {
-                "is_anomaly": is_anomaly,
-                "anomaly_score": combined_score,
-                "confidence": confidence,
-                "explanation": explanation,
-                "isolation_forest_score": if_score,
-                "cluster": int(cluster),
-                "distance_to_center": float(distance_to_center),
-                "cpu_usage": float(cpu_usage),
-                "memory_usage": float(memory_usage)
-            }
+            return self._anomaly_result(
+                features, host_metrics, if_anomaly, if_score,
+                combined_score, cluster, distance_to_center
+            )
             
         except Exception as e:
-            self.logger.error(f"Error detecting anomaly: {e}")
+            self.logger.error("Error detecting anomaly: %s", e)
             return {
                 "is_anomaly": False,
                 "anomaly_score": 0.0,
@@ -276,6 +457,115 @@ class AnomalyDetector:
                 "explanation": f"Error: {str(e)}"
             }
     
+    def detect_anomaly_json(self, host_metrics: Dict[str, Any],
+                            network_metrics: Dict[str, Any]) -> bytes:
+        """
+        detect_anomaly dengan hasil langsung berupa JSON (bytes) untuk lapisan API
+        orjson (jika tersedia) menserialisasi skalar numpy tanpa konversi manual
+        """
+        result = self.detect_anomaly(host_metrics, network_metrics)
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(result, default=_jsonize).encode('utf-8')
+    
+    def detect_anomaly_batch(self, samples: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Deteksi anomali untuk banyak pasangan (host_metrics, network_metrics)
+        Setiap model sklearn dipanggil sekali untuk seluruh batch
+        """
+        if not self.is_trained:
+            return [{
+                "is_anomaly": False,
+                "anomaly_score": 0.0,
+                "confidence": 0.0,
+                "explanation": "Model belum dilatih"
+            } for _ in samples]
+        
+        try:
+            # Matriks fitur (N, 31), setiap baris diisi langsung
+            X = np.zeros((len(samples), _FEATURE_COUNT), dtype=np.float32)
+            for row, (host_metrics, network_metrics) in zip(X, samples):
+                self._fill_features(row, host_metrics, network_metrics)
+            
+            X_scaled = self._scale(X)
+            if_scores = self._iforest_decision_function(X_scaled)
+            if_anomalies = np.where(if_scores < 0, -1, 1)
+            
+            # Jarak setiap sampel ke semua center cluster sekaligus:
+            # |x - c|^2 = |x|^2 + |c|^2 - 2 x.c dengan satu perkalian matriks (BLAS)
+            squared_distances = (
+                np.einsum('ij,ij->i', X_scaled, X_scaled)[:, np.newaxis]
+                + self._centers_sqnorm
+                - 2.0 * (X_scaled @ self._centers_T)
+            )
+            distances = np.sqrt(np.maximum(squared_distances, 0))
+            clusters = distances.argmin(axis=1)
+            distances_to_center = distances[np.arange(len(samples)), clusters]
+            max_distances = distances.max(axis=1)
+            
+            if_normalized = np.maximum(0, (if_scores + 0.5) * 100)
+            distance_normalized = np.divide(
+                distances_to_center * 100, max_distances,
+                out=np.zeros_like(max_distances), where=max_distances > 0
+            )
+            combined_scores = (if_normalized * 0.7) + (distance_normalized * 0.3)
+            
+            return [
+                self._anomaly_result(
+                    X[i], host_metrics, if_anomalies[i], if_scores[i],
+                    combined_scores[i], clusters[i], distances_to_center[i]
+                )
+                for i, (host_metrics, _) in enumerate(samples)
+            ]
+            
+        except Exception as e:
+            # Skor ulang per sampel agar satu data rusak tidak menggagalkan batch
+            self.logger.error("Error detecting anomaly batch, falling back to per-sample: %s", e)
+            return [
+                self.detect_anomaly(host_metrics, network_metrics)
+                for host_metrics, network_metrics in samples
+            ]
+    
+    def _anomaly_result(self, features: np.ndarray, host_metrics: Dict[str, Any],
+                        if_anomaly: int, if_score: float, combined_score: float,
+                        cluster: int, distance_to_center: float) -> Dict[str, Any]:
+        """Susun hasil deteksi satu sampel dari skor model"""
+        # Skalar numpy (jalur batch) dijadikan tipe Python agar hasil bisa di-json
+        combined_score = float(combined_score)
+        if_score = float(if_score)
+        
+        # Handle NaN values
+        if combined_score != combined_score:
+            combined_score = 0.0
+        
+        # Tentukan apakah anomali
+        is_anomaly = bool(if_anomaly == -1 or combined_score > 85)
+        
+        # Hitung confidence
+        confidence = min(100, combined_score)
+        
+        # Generate explanation
+        explanation = self._generate_explanation(
+            features, if_anomaly, combined_score, cluster
+        )
+        
+        # Extract CPU and memory usage for monitoring display
+        # Always use the 'system' structure since that's what collect_all_metrics returns
+        cpu_usage = host_metrics.get('system', {}).get('cpu', {}).get('percent', 0)
+        memory_usage = host_metrics.get('system', {}).get('memory', {}).get('percent', 0)
+        
+        return {
+            "is_anomaly": is_anomaly,
+            "anomaly_score": combined_score,
+            "confidence": confidence,
+            "explanation": explanation,
+            "isolation_forest_score": if_score,
+            "cluster": int(cluster),
+            "distance_to_center": float(distance_to_center),
+            "cpu_usage": float(cpu_usage),
+            "memory_usage": float(memory_usage)
+        }
+    
     def _generate_explanation(self, features: np.ndarray, if_anomaly: int, 
                             score: float, cluster: int) -> str:
         """Generate penjelasan untuk hasil deteksi anomali"""
@@ -289,38 +579,10 @@ class AnomalyDetector:
         elif score > 60:
             explanations.append("Skor anomali tinggi")
         
-        # Analisis fitur individual
-        feature_names = [
-            "CPU Usage", "Memory Usage", "Disk Usage", 
-            "Network Sent (MB)", "Network Received (MB)",
-            "Process Count", "Suspicious Processes", 
-            "Max CPU Process", "Max Memory Process",
-            "Modified Critical Files", "Network Connections",
-            "Total Events", "Alert Events", "Foreign Connections",
-            "Unique Source IPs", "Unique Dest IPs", "Unique Ports",
-            "Suspicious Patterns", "Network Anomaly Score"
-        ]
-        
-        # Cari fitur dengan nilai ekstrem
-        for i, (name, value) in enumerate(zip(feature_names, features[0])):
-            if i < 5:  # Metrik sistem
-                if value > 80:
-                    explanations.append(f"{name} sangat tinggi: {value:.1f}%")
-            elif i == 5:  # Process count
-                if value > 200:
-                    explanations.append(f"Terlalu banyak proses: {int(value)}")
-            elif i == 6:  # Suspicious processes
-                if value > 0:
-                    explanations.append(f"Proses mencurigakan: {int(value)}")
-            elif i == 9:  # Modified critical files
-                if value > 0:
-                    explanations.append(f"File kritis dimodifikasi: {int(value)}")
-            elif i == 10:  # Network connections
-                if value > 50:
-                    explanations.append(f"Banyak koneksi jaringan: {int(value)}")
-            elif i == 13:  # Foreign connections
-                if value > 10:
-                    explanations.append(f"Banyak koneksi asing: {int(value)}")
+        # Cari fitur dengan nilai ekstrem (satu perbandingan untuk semua ambang)
+        for i in np.flatnonzero(features > _EXPLAIN_THRESHOLDS):
+            template, as_int = _EXPLAIN_MESSAGES[i]
+            explanations.append(template.format(int(features[i]) if as_int else features[i]))
         
         if not explanations:
             explanations.append("Tidak ada indikator anomali yang jelas")
@@ -328,18 +590,32 @@ class AnomalyDetector:
         return "; ".join(explanations)
     
     def save_models(self):
-        """Simpan model yang sudah dilatih"""
+        """
+        Simpan model yang sudah dilatih sebagai array .npy yang bisa di-mmap
+        (statistik scaler, center K-Means dan pohon Isolation Forest) untuk skor,
+        ditambah estimator sklearn (.pkl) untuk atribut scaler, isolation_forest
+        dan kmeans
+        """
         try:
             # Simpan scaler
-            joblib.dump(self.scaler, f"{self.model_path}/scaler.pkl")
+            if self._scaler_mean is not None:
+                _save_array(f"{self.model_path}/scaler_mean.npy", self._scaler_mean)
+                _save_array(f"{self.model_path}/scaler_scale.npy", self._scaler_scale)
+            if hasattr(self.scaler, 'mean_'):
+                _save_estimator(f"{self.model_path}/scaler.pkl", self.scaler)
             
             # Simpan Isolation Forest
-            if self.isolation_forest:
-                joblib.dump(self.isolation_forest, f"{self.model_path}/isolation_forest.pkl")
+            if self._iforest is not None:
+                for name in _IFOREST_ARRAYS:
+                    _save_array(f"{self.model_path}/iforest_{name}.npy", self._iforest[name])
+            if self.isolation_forest is not None:
+                _save_estimator(f"{self.model_path}/isolation_forest.pkl", self.isolation_forest)
             
             # Simpan K-Means
-            if self.kmeans:
-                joblib.dump(self.kmeans, f"{self.model_path}/kmeans.pkl")
+            if self._centers is not None:
+                _save_array(f"{self.model_path}/kmeans_centers.npy", self._centers)
+            if self.kmeans is not None:
+                _save_estimator(f"{self.model_path}/kmeans.pkl", self.kmeans)
             
             # Simpan metadata
             metadata = {
@@ -355,21 +631,56 @@ class AnomalyDetector:
             self.logger.info("Model berhasil disimpan")
             
         except Exception as e:
-            self.logger.error(f"Error saving models: {e}")
+            self.logger.error("Error saving models: %s", e)
+    
+    def _warm_up(self):
+        """
+        Jalankan deteksi dummy (tunggal dan batch) setelah load, agar spesialisasi
+        kernel untuk array mmap, halaman model dan thread pool BLAS sudah siap
+        sebelum request pertama
+        """
+        self.detect_anomaly({}, {})
+        self.detect_anomaly_batch([({}, {})])
+    
+    def _load_array(self, name: str) -> np.ndarray:
+        """Load array .npy model secara memory-mapped (halaman dibagi antar proses)"""
+        return np.asarray(np.load(f"{self.model_path}/{name}.npy", mmap_mode='r'))
     
     def load_models(self) -> bool:
-        """Load model yang sudah disimpan"""
+        """
+        Load model yang sudah disimpan
+        Skor memakai array .npy (mmap); estimator sklearn (.pkl) dimuat ke atribut
+        scaler, isolation_forest dan kmeans. Model lama yang hanya berupa .pkl
+        tetap bisa dimuat
+        """
         try:
+            # Load estimator sklearn
+            if os.path.exists(f"{self.model_path}/scaler.pkl"):
+                self.scaler = joblib.load(f"{self.model_path}/scaler.pkl")
+            if os.path.exists(f"{self.model_path}/isolation_forest.pkl"):
+                self.isolation_forest = joblib.load(f"{self.model_path}/isolation_forest.pkl")
+            if os.path.exists(f"{self.model_path}/kmeans.pkl"):
+                self.kmeans = joblib.load(f"{self.model_path}/kmeans.pkl")
+            
             # Load scaler
-            self.scaler = joblib.load(f"{self.model_path}/scaler.pkl")
+            if os.path.exists(f"{self.model_path}/scaler_mean.npy"):
+                # Model lama menyimpan float64; dikonversi sekali saat load
+                self._scaler_mean = self._load_array("scaler_mean").astype(np.float32, copy=False)
+                self._scaler_scale = self._load_array("scaler_scale").astype(np.float32, copy=False)
+            else:
+                self._cache_scaler_params()
             
             # Load Isolation Forest
-            if os.path.exists(f"{self.model_path}/isolation_forest.pkl"):
-                self.isolation_forest = joblib.load(f"{self.model_path}/isolation_forest.pkl")
+            if all(os.path.exists(f"{self.model_path}/iforest_{name}.npy") for name in _IFOREST_ARRAYS):
+                self._iforest = {name: self._load_array(f"iforest_{name}") for name in _IFOREST_ARRAYS}
+            elif self.isolation_forest is not None:
+                self._export_isolation_forest()
             
             # Load K-Means
-            if os.path.exists(f"{self.model_path}/kmeans.pkl"):
-                self.kmeans = joblib.load(f"{self.model_path}/kmeans.pkl")
+            if os.path.exists(f"{self.model_path}/kmeans_centers.npy"):
+                self._cache_centers(self._load_array("kmeans_centers"))
+            elif self.kmeans is not None:
+                self._cache_centers(self.kmeans.cluster_centers_)
             
             # Load metadata
             with open(f"{self.model_path}/metadata.json", 'r') as f:
@@ -377,9 +688,12 @@ class AnomalyDetector:
                 self.feature_columns = metadata.get('feature_columns', [])
                 self.is_trained = metadata.get('is_trained', False)
             
+            if self.is_trained:
+                self._warm_up()
+            
             self.logger.info("Model berhasil dimuat")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error loading models: {e}")
+            self.logger.error("Error loading models: %s", e)
             return False
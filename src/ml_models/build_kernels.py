@@ -0,0 +1,27 @@
+"""
+Kompilasi AOT kernel skor AnomalyDetector (scoring_kernels) menjadi modul
+ekstensi anomaly_kernels di direktori ini, sehingga deteksi tidak menunggu
+JIT dan kode mesinnya dibagi antar proses lewat mmap dari .so
+
+Jalankan sekali saat build (butuh numba dan compiler C):
+    python -m src.ml_models.build_kernels
+"""
+
+import os
+
+from numba.pycc import CC
+
+from . import scoring_kernels
+
+
+def build(output_dir: str = os.path.dirname(os.path.abspath(__file__))) -> None:
+    """Bangun modul anomaly_kernels dari semua kernel di AOT_SIGNATURES"""
+    cc = CC('anomaly_kernels')
+    cc.output_dir = output_dir
+    for name, signature in scoring_kernels.AOT_SIGNATURES.items():
+        cc.export(name, signature)(getattr(scoring_kernels, name))
+    cc.compile()
+
+
+if __name__ == '__main__':
+    build()
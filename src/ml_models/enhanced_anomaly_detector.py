@@ -8,23 +8,119 @@ import pandas as pd
 import time
 import json
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 from collections import deque
 import statistics
+from sklearn.base import clone
 from sklearn.ensemble import IsolationForest, RandomForestClassifier
 from sklearn.cluster import DBSCAN, KMeans
+from sklearn.exceptions import NotFittedError
 from sklearn.neural_network import MLPClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.metrics import pairwise_distances_argmin_min
+from sklearn.model_selection import train_test_split
+from sklearn.utils.validation import check_is_fitted
+from scipy.optimize import minimize
 import joblib
 import os
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        def decorator(func):
+            return func
+        return decorator
+
+try:
+    import lz4  # noqa: F401 (joblib compression backend)
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+
+@njit(cache=True)
+def _feature_z_scores(features, valid):
+    """|z| per row and feature of baseline-normalized features; 0 where the baseline std is not positive"""
+    z = np.zeros(features.shape)
+    for r in range(features.shape[0]):
+        for i in range(features.shape[1]):
+            if valid[i]:
+                z[r, i] = abs(features[r, i])
+    return z
+
+
+@njit(cache=True)
+def _agreement_confidence(predictions, weights):
+    """Confidence from the weighted agreement of model predictions"""
+    total_weight = weights.sum()
+    if predictions.shape[0] == 0 or total_weight == 0:
+        return 0.0
+    
+    agreement = (predictions * weights).sum() / total_weight
+    
+    if agreement > 0.8 or agreement < 0.2:
+        return 0.9  # High confidence
+    elif agreement > 0.6 or agreement < 0.4:
+        return 0.7  # Medium confidence
+    return 0.5  # Low confidence
+
+
+def _fit_estimator(estimator, X: np.ndarray, y: np.ndarray = None):
+    """Fit one estimator, returning it or the raised exception (unit of work for the parallel retrain)"""
+    try:
+        if y is None:
+            return estimator.fit(X)
+        return estimator.fit(X, y)
+    except Exception as e:
+        return e
+
+
 class EnhancedAnomalyDetector:
     """Enhanced anomaly detection with multiple ML algorithms"""
     
+    # Trend features are slopes over the last _TREND_WINDOW raw feature rows
+    _TREND_WINDOW = 10
+    _TREND_X = np.arange(_TREND_WINDOW, dtype=np.float64)
+    _TREND_SOURCES = ('cpu_usage', 'memory_usage', 'network_bandwidth', 'process_count')
+    _TREND_FEATURES = ('cpu_trend', 'memory_trend', 'network_trend', 'process_trend')
+    
+    # (metric key, feature index) gathered from each metrics dict
+    _HOST_FIELDS = (('cpu_usage', 0), ('memory_usage', 1), ('disk_usage', 2), ('process_count', 4))
+    _NETWORK_FIELDS = (('packets_per_second', 3), ('connections', 5))
+    _ADDITIONAL_FIELDS = (('file_changes', 6), ('response_time', 7))
+    
+    _SUPERVISED_MODELS = ('random_forest', 'mlp_classifier', 'logistic_regression')
+    _UNSUPERVISED_MODELS = ('isolation_forest', 'dbscan', 'kmeans')
+    _FOREST_MODELS = ('isolation_forest', 'random_forest')
+    
+    # Warm-started models continue from the previous retrain; the random
+    # forest replaces its oldest trees with this many new ones each time
+    _WARM_START_MODELS = ('random_forest', 'mlp_classifier')
+    _RF_WARM_START_TREES = 20
+    
+    # Feature rows kept for retraining, and raw metric entries kept for debugging
+    _HISTORY_SIZE = 10000
+    _DEBUG_HISTORY_SIZE = 100
+    
+    # Pattern categories matched against feature names; anything else is "other"
+    _PATTERN_CATEGORIES = ('cpu', 'memory', 'network', 'process')
+    
+    # All persisted model state lives in one bundle file
+    _BUNDLE_FILE = "model_bundle.joblib"
+    _BUNDLE_COMPRESS = ('lz4', 3) if LZ4_AVAILABLE else 0
+    
+    # Training samples within this many seconds of an anomaly are labelled anomalous
+    _LABEL_WINDOW = 300.0
+    
     def __init__(self, config_manager):
         self.config_manager = config_manager
         self.logger = logging.getLogger(__name__)
@@ -32,13 +128,22 @@ class EnhancedAnomalyDetector:
         
         # Models
         self.models = {}
+        self._fittable_models_count = 0
+        self._fitted = {}
         self.scalers = {}
+        self._scaler_mean = None
+        self._scaler_scale = None
+        self._dbscan_core = None
+        self._dbscan_eps = None
+        self._km_centers = None
         self.model_weights = {}
         self.model_performance = {}
         
         # Data
-        self.feature_history = deque(maxlen=10000)
+        self.feature_history = deque(maxlen=self._DEBUG_HISTORY_SIZE)
         self.anomaly_history = deque(maxlen=1000)
+        self._anomaly_times = deque(maxlen=1000)
+        self._anomaly_flags = deque(maxlen=1000)
         self.baseline_features = {}
         
         # Configuration
@@ -46,15 +151,53 @@ class EnhancedAnomalyDetector:
         self.retrain_interval = 3600  # 1 hour
         self.last_retrain = 0
         
+        # Fast path: with a baseline, inputs whose feature z-scores all stay
+        # below this skip the model ensemble (counters kept for tuning it)
+        self.fast_path_z = 1.0
+        self._fast_path_hits = 0
+        self._detections = 0
+        
         # Feature engineering
         self.feature_names = [
             'cpu_usage', 'memory_usage', 'disk_usage', 'network_bandwidth',
             'process_count', 'connection_count', 'file_changes', 'response_time',
             'cpu_trend', 'memory_trend', 'network_trend', 'process_trend'
         ]
+        self._fname_idx = {name: i for i, name in enumerate(self.feature_names)}
+        self._baseline_mean = np.zeros(len(self.feature_names), dtype=np.float32)
+        self._baseline_std = np.ones(len(self.feature_names), dtype=np.float32)
+        self._baseline_valid = np.ones(len(self.feature_names), dtype=np.bool_)
+        self._trend_idx = np.array([self._fname_idx[name] for name in self._TREND_SOURCES])
+        self._trend_out_idx = np.array([self._fname_idx[name] for name in self._TREND_FEATURES])
+        self._feat_category = np.array([
+            next((c for c, category in enumerate(self._PATTERN_CATEGORIES) if category in name),
+                 len(self._PATTERN_CATEGORIES))
+            for name in self.feature_names
+        ], dtype=np.int8)
+        
+        # Ring buffers of extracted features and their epoch times for retraining
+        self._feat_buf = np.zeros((self._HISTORY_SIZE, len(self.feature_names)), dtype=np.float32)
+        self._ts_buf = np.zeros(self._HISTORY_SIZE, dtype=np.float64)
+        self._buf_cursor = 0
+        self._buf_full = False
+        
+        # Ring buffer of recent raw feature rows for trend calculation
+        self._recent = np.zeros((self._TREND_WINDOW, len(self.feature_names)))
+        self._recent_pos = 0
+        self._recent_count = 0
+        
+        # Status fields that change only on init/load/retrain, republished by
+        # swapping in a new dict so get_detector_status never takes the lock
+        self._status_snapshot = {}
+        
+        # Bumped (under detector_lock) by every state change; get_detector_status
+        # reuses its last result while the version is unchanged
+        self._state_version = 0
+        self._cached_status = (-1, {})
         
         # Initialize models
         self._initialize_models()
+        self._publish_status()
     
     def _initialize_models(self):
         """Initialize all anomaly detection models"""
@@ -62,11 +205,12 @@ class EnhancedAnomalyDetector:
             os.makedirs(self.model_dir, exist_ok=True)
             
             # Initialize models
-            self.models = {
+            models = {
                 'isolation_forest': IsolationForest(
                     contamination=0.1,
                     random_state=42,
-                    n_estimators=100
+                    n_estimators=100,
+                    n_jobs=1
                 ),
                 'dbscan': DBSCAN(
                     eps=0.5,
@@ -80,18 +224,25 @@ class EnhancedAnomalyDetector:
                 'random_forest': RandomForestClassifier(
                     n_estimators=100,
                     random_state=42,
-                    max_depth=10
+                    max_depth=10,
+                    n_jobs=1,
+                    warm_start=True
                 ),
                 'mlp_classifier': MLPClassifier(
                     hidden_layer_sizes=(100, 50),
                     random_state=42,
-                    max_iter=1000
+                    max_iter=50,
+                    warm_start=True
                 ),
                 'logistic_regression': LogisticRegression(
                     random_state=42,
                     max_iter=1000
                 )
             }
+            self.models = {}
+            self._fittable_models_count = 0
+            for model_name, model in models.items():
+                self._register_model(model_name, model)
             
             # Initialize scalers
             self.scalers = {
@@ -119,6 +270,7 @@ class EnhancedAnomalyDetector:
                     'last_update': 0
                 } for model_name in self.models.keys()
             }
+            self._fitted = {model_name: False for model_name in self.models}
             
             # Load existing models if available
             self._load_models()
@@ -132,253 +284,289 @@ class EnhancedAnomalyDetector:
                               network_metrics: Dict[str, Any],
                               additional_features: Dict[str, Any] = None) -> Dict[str, Any]:
         """Detect anomalies using enhanced ensemble approach"""
+        return self.detect_enhanced_anomaly_batch([(host_metrics, network_metrics, additional_features)])[0]
+    
+    def detect_enhanced_anomaly_batch(self, events: List[Tuple[Dict[str, Any], ...]]) -> List[Dict[str, Any]]:
+        """
+        Detect anomalies for many events, calling each model once per batch
+        events holds (host_metrics, network_metrics[, additional_features]) tuples in
+        arrival order; results come back in the same order
+        """
         try:
-            # Extract features
-            features = self._extract_features(host_metrics, network_metrics, additional_features)
-            
-            if not features:
-                return {"is_anomaly": False, "anomaly_score": 0.0, "error": "No features extracted"}
+            # Extract features in arrival order (trend features depend on earlier rows)
+            rows = [self._extract_features(*event) for event in events]
+            results = [
+                {"is_anomaly": False, "anomaly_score": 0.0, "error": "No features extracted"}
+                for _ in events
+            ]
+            extracted = [i for i, row in enumerate(rows) if len(row)]
+            if not extracted:
+                return results
+            raw_features = np.vstack([rows[i] for i in extracted])
             
-            # Store features for training
+            # Store raw features for training (the baseline is recomputed from them)
+            now = time.time()
             with self.detector_lock:
-                self.feature_history.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "features": features,
-                    "host_metrics": host_metrics,
-                    "network_metrics": network_metrics
-                })
+                slots = (self._buf_cursor + np.arange(len(raw_features))) % self._HISTORY_SIZE
+                self._feat_buf[slots] = raw_features
+                self._ts_buf[slots] = now
+                self._buf_full = self._buf_full or self._buf_cursor + len(raw_features) >= self._HISTORY_SIZE
+                self._buf_cursor = int(slots[-1] + 1) % self._HISTORY_SIZE
+                for i in extracted:
+                    self.feature_history.append({
+                        "timestamp": now,
+                        "host_metrics": events[i][0],
+                        "network_metrics": events[i][1]
+                    })
             
-            # Detect anomalies using ensemble
-            ensemble_result = self._ensemble_anomaly_detection(features)
-            
-            # Analyze anomaly patterns
-            pattern_analysis = self._analyze_anomaly_patterns(features, ensemble_result)
-            
-            # Determine threat level
-            threat_level = self._determine_threat_level(ensemble_result, pattern_analysis)
-            
-            # Store anomaly result
-            anomaly_result = {
-                "is_anomaly": ensemble_result["is_anomaly"],
-                "anomaly_score": ensemble_result["anomaly_score"],
-                "confidence": ensemble_result["confidence"],
-                "threat_level": threat_level,
-                "pattern_analysis": pattern_analysis,
-                "model_predictions": ensemble_result["model_predictions"],
-                "features": features,
-                "timestamp": datetime.now().isoformat()
-            }
+            # Normalize features
+            features = (raw_features - self._baseline_mean) / self._baseline_std
+            
+            # Obvious-normal inputs skip the ensemble; the rest use all models
+            z_scores = _feature_z_scores(features, self._baseline_valid)
+            max_z = z_scores.max(axis=1)
+            if self.baseline_features:
+                fast_path = max_z < self.fast_path_z
+            else:
+                fast_path = np.zeros(len(features), dtype=bool)
+            self._detections += len(features)
+            self._fast_path_hits += int(fast_path.sum())
+            
+            ensemble_results = [None] * len(features)
+            for j in np.flatnonzero(fast_path):
+                ensemble_results[j] = {
+                    "is_anomaly": False,
+                    "anomaly_score": float(max_z[j]) / 3,
+                    "confidence": 0.9,
+                    "model_predictions": {}
+                }
+            ensemble_rows = np.flatnonzero(~fast_path)
+            if len(ensemble_rows):
+                for j, ensemble_result in zip(ensemble_rows, self._ensemble_anomaly_detection(features[ensemble_rows])):
+                    ensemble_results[j] = ensemble_result
             
+            for j, i in enumerate(extracted):
+                ensemble_result = ensemble_results[j]
+                
+                # Analyze anomaly patterns
+                pattern_analysis = self._analyze_anomaly_patterns(features[j], ensemble_result, z_scores[j])
+                
+                # Determine threat level
+                threat_level = self._determine_threat_level(ensemble_result, pattern_analysis)
+                
+                # Store anomaly result
+                anomaly_result = {
+                    "is_anomaly": ensemble_result["is_anomaly"],
+                    "anomaly_score": ensemble_result["anomaly_score"],
+                    "confidence": ensemble_result["confidence"],
+                    "threat_level": threat_level,
+                    "pattern_analysis": pattern_analysis,
+                    "model_predictions": ensemble_result["model_predictions"],
+                    "features": features[j].tolist(),
+                    "timestamp": now
+                }
+                
+                with self.detector_lock:
+                    self.anomaly_history.append(anomaly_result)
+                    self._anomaly_times.append(now)
+                    self._anomaly_flags.append(anomaly_result["is_anomaly"])
+                
+                results[i] = anomaly_result
+            
+            # One version bump per batch, after all of its state changes
             with self.detector_lock:
-                self.anomaly_history.append(anomaly_result)
+                self._state_version += 1
             
             # Retrain models if needed
             self._check_retrain_models()
             
-            return anomaly_result
+            return results
             
         except Exception as e:
             self.logger.error(f"Enhanced anomaly detection failed: {e}")
-            return {"is_anomaly": False, "anomaly_score": 0.0, "error": str(e)}
+            return [{"is_anomaly": False, "anomaly_score": 0.0, "error": str(e)} for _ in events]
     
     def _extract_features(self, host_metrics: Dict[str, Any], 
                          network_metrics: Dict[str, Any],
-                         additional_features: Dict[str, Any] = None) -> List[float]:
-        """Extract comprehensive features from metrics"""
+                         additional_features: Dict[str, Any] = None) -> np.ndarray:
+        """Extract comprehensive raw (not yet normalized) features from metrics"""
         try:
-            features = []
-            
-            # Basic system features
-            cpu_usage = host_metrics.get("cpu_usage", 0)
-            memory_usage = host_metrics.get("memory_usage", 0)
-            disk_usage = host_metrics.get("disk_usage", 0)
-            process_count = host_metrics.get("process_count", 0)
-            
-            # Network features
-            network_bandwidth = network_metrics.get("packets_per_second", 0)
-            connection_count = network_metrics.get("connections", 0)
+            features = np.zeros(len(self.feature_names), dtype=np.float32)
             
-            # Additional features
-            file_changes = additional_features.get("file_changes", 0) if additional_features else 0
-            response_time = additional_features.get("response_time", 0) if additional_features else 0
+            # Basic system, network and additional features
+            for key, i in self._HOST_FIELDS:
+                features[i] = host_metrics.get(key, 0)
+            for key, i in self._NETWORK_FIELDS:
+                features[i] = network_metrics.get(key, 0)
+            if additional_features:
+                for key, i in self._ADDITIONAL_FIELDS:
+                    features[i] = additional_features.get(key, 0)
             
             # Calculate trend features
-            cpu_trend = self._calculate_trend_feature('cpu_usage', cpu_usage)
-            memory_trend = self._calculate_trend_feature('memory_usage', memory_usage)
-            network_trend = self._calculate_trend_feature('network_bandwidth', network_bandwidth)
-            process_trend = self._calculate_trend_feature('process_count', process_count)
-            
-            # Combine all features
-            features = [
-                cpu_usage, memory_usage, disk_usage, network_bandwidth,
-                process_count, connection_count, file_changes, response_time,
-                cpu_trend, memory_trend, network_trend, process_trend
-            ]
+            features[self._trend_out_idx] = self._calculate_trend_features()
             
-            # Normalize features
-            features = self._normalize_features(features)
+            # Remember the raw row for later trend calculations
+            self._recent[self._recent_pos] = features
+            self._recent_pos = (self._recent_pos + 1) % self._TREND_WINDOW
+            self._recent_count = min(self._recent_count + 1, self._TREND_WINDOW)
             
             return features
             
         except Exception as e:
             self.logger.error(f"Feature extraction failed: {e}")
-            return []
+            return np.empty(0, dtype=np.float32)
     
-    def _calculate_trend_feature(self, feature_name: str, current_value: float) -> float:
-        """Calculate trend feature based on historical data"""
+    def _calculate_trend_features(self) -> np.ndarray:
+        """Calculate cpu/memory/network/process trends (slopes) over recent rows"""
         try:
-            if len(self.feature_history) < 5:
-                return 0.0
-            
-            # Get recent values for this feature
-            recent_values = []
-            for entry in list(self.feature_history)[-10:]:
-                features = entry.get("features", [])
-                if len(features) >= len(self.feature_names):
-                    feature_index = self.feature_names.index(feature_name)
-                    recent_values.append(features[feature_index])
-            
-            if len(recent_values) < 3:
-                return 0.0
+            n = self._recent_count
+            if n < 5:
+                return np.zeros(len(self._TREND_SOURCES))
             
-            # Calculate trend (slope)
-            x = np.arange(len(recent_values))
-            y = np.array(recent_values)
+            # Recent values of the trend source columns, oldest first
+            rows = (self._recent_pos - n + np.arange(n)) % self._TREND_WINDOW
+            y = self._recent[rows[:, None], self._trend_idx]
             
-            # Simple linear regression slope
-            slope = np.polyfit(x, y, 1)[0]
+            # Closed-form least-squares slope for all columns at once
+            x = self._TREND_X[:n] - self._TREND_X[:n].mean()
+            slope = (x @ (y - y.mean(axis=0))) / (x @ x)
             
             return slope
             
         except Exception as e:
-            self.logger.error(f"Trend calculation failed for {feature_name}: {e}")
-            return 0.0
+            self.logger.error(f"Trend calculation failed: {e}")
+            return np.zeros(len(self._TREND_SOURCES))
     
-    def _normalize_features(self, features: List[float]) -> List[float]:
-        """Normalize features using baseline statistics"""
+    def _ensemble_anomaly_detection(self, features: np.ndarray) -> List[Dict[str, Any]]:
+        """Perform ensemble anomaly detection for each row of features"""
         try:
-            if not self.baseline_features:
-                return features
-            
-            normalized_features = []
-            for i, feature in enumerate(features):
-                if i < len(self.feature_names):
-                    feature_name = self.feature_names[i]
-                    baseline_stats = self.baseline_features.get(feature_name, {})
-                    
-                    mean = baseline_stats.get("mean", 0)
-                    std = baseline_stats.get("std", 1)
-                    
-                    if std > 0:
-                        normalized_feature = (feature - mean) / std
-                    else:
-                        normalized_feature = feature
-                    
-                    normalized_features.append(normalized_feature)
-                else:
-                    normalized_features.append(feature)
-            
-            return normalized_features
-            
-        except Exception as e:
-            self.logger.error(f"Feature normalization failed: {e}")
-            return features
-    
-    def _ensemble_anomaly_detection(self, features: List[float]) -> Dict[str, Any]:
-        """Perform ensemble anomaly detection"""
-        try:
-            features_array = np.array(features).reshape(1, -1)
-            
-            # Scale features
-            scaled_features = self.scalers['standard'].fit_transform(features_array)
+            # Scale features with the statistics frozen at the last retrain
+            if self._scaler_mean is not None:
+                scaled_features = (features - self._scaler_mean) / self._scaler_scale
+            else:
+                scaled_features = features
             
-            model_predictions = {}
-            anomaly_scores = []
+            model_predictions = [{} for _ in range(len(features))]
+            probabilities = []
+            weights = []
             
-            # Get predictions from each model
+            # Get predictions from each model, one call for all rows
             for model_name, model in self.models.items():
+                weight = self.model_weights[model_name]
+                
+                if not self._fitted.get(model_name, False):
+                    for row_predictions in model_predictions:
+                        row_predictions[model_name] = {
+                            "prediction": 0,
+                            "score": 0.0,
+                            "weight": weight,
+                            "error": "Model not trained"
+                        }
+                    continue
+                
                 try:
-                    if model_name in ['isolation_forest', 'dbscan', 'kmeans']:
-                        # Unsupervised models
-                        if model_name == 'isolation_forest':
-                            score = model.decision_function(scaled_features)[0]
-                            prediction = model.predict(scaled_features)[0]
-                            anomaly_scores.append(score)
-                        elif model_name == 'dbscan':
-                            prediction = model.fit_predict(scaled_features)[0]
-                            score = -1 if prediction == -1 else 1  # -1 is outlier
-                            anomaly_scores.append(score)
-                        elif model_name == 'kmeans':
-                            distances = model.transform(scaled_features)[0]
-                            score = np.min(distances)
-                            prediction = 1 if score > np.mean(distances) * 1.5 else 0
-                            anomaly_scores.append(score)
-                        
-                        model_predictions[model_name] = {
-                            "prediction": prediction,
-                            "score": score,
-                            "weight": self.model_weights[model_name]
+                    predictions, scores = self._model_predictions(model_name, model, scaled_features)
+                
+                except NotFittedError:
+                    # Model not trained yet
+                    for row_predictions in model_predictions:
+                        row_predictions[model_name] = {
+                            "prediction": 0,
+                            "score": 0.0,
+                            "weight": weight,
+                            "error": "Model not trained"
                         }
-                    
-                    else:
-                        # Supervised models (if trained)
-                        if hasattr(model, 'predict_proba'):
-                            try:
-                                proba = model.predict_proba(scaled_features)[0]
-                                prediction = model.predict(scaled_features)[0]
-                                score = proba[1] if len(proba) > 1 else proba[0]
-                                
-                                model_predictions[model_name] = {
-                                    "prediction": prediction,
-                                    "score": score,
-                                    "weight": self.model_weights[model_name]
-                                }
-                                
-                                anomaly_scores.append(score)
-                            except:
-                                # Model not trained yet
-                                model_predictions[model_name] = {
-                                    "prediction": 0,
-                                    "score": 0.0,
-                                    "weight": self.model_weights[model_name]
-                                    "error": "Model not trained"
-                                }
+                    continue
                 
                 except Exception as e:
                     self.logger.error(f"Model {model_name} prediction failed: {e}")
-                    model_predictions[model_name] = {
-                        "prediction": 0,
-                        "score": 0.0,
-                        "weight": self.model_weights[model_name],
-                        "error": str(e)
+                    for row_predictions in model_predictions:
+                        row_predictions[model_name] = {
+                            "prediction": 0,
+                            "score": 0.0,
+                            "weight": weight,
+                            "error": str(e)
+                        }
+                    continue
+                
+                probabilities.append(self._anomaly_probability(model_name, model, predictions, scores))
+                weights.append(weight)
+                for row_predictions, prediction, score in zip(model_predictions, predictions.tolist(), scores.tolist()):
+                    row_predictions[model_name] = {
+                        "prediction": prediction,
+                        "score": score,
+                        "weight": weight
                     }
             
-            # Calculate ensemble score
-            if anomaly_scores:
-                ensemble_score = np.mean(anomaly_scores)
-                ensemble_prediction = 1 if ensemble_score > 0.5 else 0
+            # Weighted anomaly probability over the models that answered
+            if probabilities:
+                weights = np.array(weights, dtype=np.float64)
+                ensemble_scores = np.array(probabilities).T @ (weights / weights.sum())
             else:
-                ensemble_score = 0.0
-                ensemble_prediction = 0
-            
-            # Calculate confidence
-            confidence = self._calculate_confidence(model_predictions)
-            
-            return {
-                "is_anomaly": bool(ensemble_prediction),
-                "anomaly_score": float(ensemble_score),
-                "confidence": confidence,
-                "model_predictions": model_predictions
-            }
+                ensemble_scores = np.zeros(len(features))
+            
+            return [
+                {
+                    "is_anomaly": bool(ensemble_score > 0.5),
+                    "anomaly_score": float(ensemble_score),
+                    "confidence": self._calculate_confidence(row_predictions),
+                    "model_predictions": row_predictions
+                }
+                for ensemble_score, row_predictions in zip(ensemble_scores, model_predictions)
+            ]
             
         except Exception as e:
             self.logger.error(f"Ensemble anomaly detection failed: {e}")
-            return {
-                "is_anomaly": False,
-                "anomaly_score": 0.0,
-                "confidence": 0.0,
-                "model_predictions": {}
-            }
+            return [
+                {
+                    "is_anomaly": False,
+                    "anomaly_score": 0.0,
+                    "confidence": 0.0,
+                    "model_predictions": {}
+                }
+                for _ in range(len(features))
+            ]
+    
+    def _model_predictions(self, model_name: str, model: Any,
+                           scaled_features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Prediction and anomaly score of one fitted model for each row"""
+        if model_name == 'isolation_forest':
+            # Same rule as IsolationForest.predict, without a second pass
+            scores = model.decision_function(scaled_features)
+            predictions = np.where(scores < 0, -1, 1)
+        elif model_name == 'dbscan':
+            # Outlier unless within eps of a core sample from training
+            if len(self._dbscan_core):
+                _, distances = pairwise_distances_argmin_min(scaled_features, self._dbscan_core)
+            else:
+                distances = np.full(len(scaled_features), np.inf)
+            predictions = np.where(distances > self._dbscan_eps, -1, 1)
+            scores = predictions  # -1 is outlier
+        elif model_name == 'kmeans':
+            # Distances to the cached cluster centers
+            diff = scaled_features[:, None, :] - self._km_centers
+            distances = np.sqrt(np.einsum('nkd,nkd->nk', diff, diff))
+            scores = distances.min(axis=1)
+            predictions = (scores > distances.mean(axis=1) * 1.5).astype(int)
+        else:
+            # Supervised models; predict() is the most probable class
+            proba = model.predict_proba(scaled_features)
+            predictions = model.classes_[proba.argmax(axis=1)]
+            scores = proba[:, 1] if proba.shape[1] > 1 else proba[:, 0]
+        return predictions, scores
+    
+    def _anomaly_probability(self, model_name: str, model: Any,
+                             predictions: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """Anomaly probability (0..1) per row from one model's predictions and scores"""
+        if model_name in ('isolation_forest', 'dbscan'):
+            return (predictions == -1).astype(np.float64)
+        if model_name == 'kmeans':
+            return predictions.astype(np.float64)
+        if 1 not in model.classes_:
+            return np.zeros(len(scores))
+        if len(model.classes_) == 1:
+            return np.ones(len(scores))
+        return np.asarray(scores, dtype=np.float64)
     
     def _calculate_confidence(self, model_predictions: Dict[str, Any]) -> float:
         """Calculate confidence based on model agreement"""
@@ -391,35 +579,19 @@ class EnhancedAnomalyDetector:
                     predictions.append(prediction_data["prediction"])
                     weights.append(prediction_data["weight"])
             
-            if not predictions:
-                return 0.0
-            
-            # Calculate weighted agreement
-            weighted_sum = sum(p * w for p, w in zip(predictions, weights))
-            total_weight = sum(weights)
-            
-            if total_weight == 0:
-                return 0.0
-            
-            agreement = weighted_sum / total_weight
-            
-            # Calculate confidence based on agreement
-            if agreement > 0.8 or agreement < 0.2:
-                confidence = 0.9  # High confidence
-            elif agreement > 0.6 or agreement < 0.4:
-                confidence = 0.7  # Medium confidence
-            else:
-                confidence = 0.5  # Low confidence
-            
-            return confidence
+            return float(_agreement_confidence(
+                np.array(predictions, dtype=np.float64),
+                np.array(weights, dtype=np.float64)
+            ))
             
         except Exception as e:
             self.logger.error(f"Confidence calculation failed: {e}")
             return 0.0
     
-    def _analyze_anomaly_patterns(self, features: List[float], 
-                                ensemble_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze anomaly patterns"""
+    def _analyze_anomaly_patterns(self, features: np.ndarray, 
+                                ensemble_result: Dict[str, Any],
+                                z_scores: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Analyze anomaly patterns (z_scores: precomputed feature z-scores, if any)"""
         try:
             pattern_analysis = {
                 "feature_anomalies": [],
@@ -428,30 +600,21 @@ class EnhancedAnomalyDetector:
                 "temporal_pattern": "unknown"
             }
             
-            # Analyze individual feature anomalies
-            for i, feature_value in enumerate(features):
-                if i < len(self.feature_names):
-                    feature_name = self.feature_names[i]
-                    baseline_stats = self.baseline_features.get(feature_name, {})
-                    
-                    mean = baseline_stats.get("mean", 0)
-                    std = baseline_stats.get("std", 1)
-                    
-                    # Check if feature is anomalous
-                    if std > 0:
-                        z_score = abs(feature_value - mean) / std
-                        if z_score > 2.0:  # 2 standard deviations
-                            pattern_analysis["feature_anomalies"].append({
-                                "feature": feature_name,
-                                "value": feature_value,
-                                "z_score": z_score,
-                                "severity": "high" if z_score > 3.0 else "medium"
-                            })
+            # Analyze individual feature anomalies, beyond 2 standard deviations
+            if z_scores is None:
+                z_scores = _feature_z_scores(features[None, :], self._baseline_valid)[0]
+            anomalous_idx = np.flatnonzero(z_scores > 2.0)
+            for i in anomalous_idx:
+                z_score = z_scores[i]
+                pattern_analysis["feature_anomalies"].append({
+                    "feature": self.feature_names[i],
+                    "value": float(features[i]),
+                    "z_score": float(z_score),
+                    "severity": "high" if z_score > 3.0 else "medium"
+                })
             
             # Determine pattern type
-            pattern_analysis["pattern_type"] = self._determine_pattern_type(
-                pattern_analysis["feature_anomalies"]
-            )
+            pattern_analysis["pattern_type"] = self._determine_pattern_type(anomalous_idx)
             
             # Analyze temporal patterns
             pattern_analysis["temporal_pattern"] = self._analyze_temporal_patterns()
@@ -462,26 +625,25 @@ class EnhancedAnomalyDetector:
             self.logger.error(f"Pattern analysis failed: {e}")
             return {"feature_anomalies": [], "pattern_type": "unknown"}
     
-    def _determine_pattern_type(self, feature_anomalies: List[Dict[str, Any]]) -> str:
-        """Determine the type of anomaly pattern"""
+    def _determine_pattern_type(self, anomalous_idx: np.ndarray) -> str:
+        """Determine the type of anomaly pattern from the anomalous feature indices"""
         try:
-            if not feature_anomalies:
+            if not len(anomalous_idx):
                 return "normal"
             
             # Count anomalies by category
-            cpu_anomalies = [a for a in feature_anomalies if "cpu" in a["feature"]]
-            memory_anomalies = [a for a in feature_anomalies if "memory" in a["feature"]]
-            network_anomalies = [a for a in feature_anomalies if "network" in a["feature"]]
-            process_anomalies = [a for a in feature_anomalies if "process" in a["feature"]]
+            cpu, memory, network, process, _ = np.bincount(
+                self._feat_category[anomalous_idx], minlength=len(self._PATTERN_CATEGORIES) + 1
+            )
             
             # Determine pattern type
-            if len(cpu_anomalies) > 0 and len(memory_anomalies) > 0:
+            if cpu > 0 and memory > 0:
                 return "resource_exhaustion"
-            elif len(network_anomalies) > 0:
+            elif network > 0:
                 return "network_anomaly"
-            elif len(process_anomalies) > 0:
+            elif process > 0:
                 return "process_anomaly"
-            elif len(feature_anomalies) > 5:
+            elif len(anomalous_idx) > 5:
                 return "system_wide_anomaly"
             else:
                 return "isolated_anomaly"
@@ -562,6 +724,7 @@ class EnhancedAnomalyDetector:
             if current_time - self.last_retrain > self.retrain_interval:
                 self._retrain_models()
                 self.last_retrain = current_time
+                self._publish_status()
                 
         except Exception as e:
             self.logger.error(f"Model retrain check failed: {e}")
@@ -571,46 +734,76 @@ class EnhancedAnomalyDetector:
         try:
             self.logger.info("Retraining anomaly detection models...")
             
-            if len(self.feature_history) < 100:
+            # Prepare training data (copied, detections keep writing the buffers)
+            with self.detector_lock:
+                n = self._history_size()
+                X = self._feat_buf[:n].astype(np.float64)
+                timestamps = self._ts_buf[:n].copy()
+            
+            if n < 100:
                 self.logger.warning("Insufficient data for retraining")
                 return
             
-            # Prepare training data
-            X = []
-            y = []
-            
-            for entry in self.feature_history:
-                features = entry.get("features", [])
-                if len(features) == len(self.feature_names):
-                    X.append(features)
-                    
-                    # Create labels based on anomaly history
-                    timestamp = datetime.fromisoformat(entry["timestamp"])
-                    is_anomaly = self._is_anomaly_at_time(timestamp)
-                    y.append(1 if is_anomaly else 0)
-            
-            if len(X) < 50:
-                self.logger.warning("Insufficient labeled data for retraining")
-                return
+            # Create labels based on anomaly history
+            y = self._anomaly_labels(timestamps)
             
-            X = np.array(X)
-            y = np.array(y)
+            # Update baseline features from the raw rows, then normalize with it
+            # exactly as detection does
+            self._update_baseline_features(X)
+            X = (X - self._baseline_mean) / self._baseline_std
             
             # Scale features
             X_scaled = self.scalers['standard'].fit_transform(X)
+            self._cache_scaler()
+            
+            # Hold out a validation split before fitting: the metrics and the
+            # ensemble weights are measured on rows the models never saw
+            _, class_counts = np.unique(y, return_counts=True)
+            X_train, X_val, y_train, y_val = train_test_split(
+                X_scaled, y, test_size=0.2, random_state=42,
+                stratify=y if len(class_counts) > 1 and class_counts.min() >= 2 else None
+            )
+            
+            self._prepare_warm_start(y_train)
+            
+            # Fit supervised and unsupervised models in parallel. Threads: the
+            # fits spend their time in native code that releases the GIL.
+            # The pool already uses every CPU, so the forests stay
+            # single-threaded (models loaded from older files may not be)
+            jobs = [(name, y_train) for name in self._SUPERVISED_MODELS]
+            jobs += [(name, None) for name in self._UNSUPERVISED_MODELS]
+            for name in self._FOREST_MODELS:
+                self.models[name].set_params(n_jobs=1)
+            fitted = joblib.Parallel(n_jobs=min(len(jobs), os.cpu_count() or 1), prefer='threads')(
+                joblib.delayed(_fit_estimator)(self.models[name], X_train, target)
+                for name, target in jobs
+            )
             
-            # Retrain supervised models
-            for model_name in ['random_forest', 'mlp_classifier', 'logistic_regression']:
+            for (model_name, target), model in zip(jobs, fitted):
+                if isinstance(model, Exception):
+                    self.logger.error(f"Failed to retrain {model_name}: {model}")
+                    self._fitted[model_name] = False
+                    continue
+                
+                with self.detector_lock:
+                    self._register_model(model_name, model)
+                self._fitted[model_name] = True
+                
+                if target is None:
+                    if model_name == 'dbscan':
+                        self._cache_dbscan()
+                    elif model_name == 'kmeans':
+                        self._cache_kmeans()
+                    self.logger.info(f"Model {model_name} retrained")
+                    continue
+                
                 try:
-                    model = self.models[model_name]
-                    model.fit(X_scaled, y)
-                    
-                    # Evaluate model
-                    y_pred = model.predict(X_scaled)
-                    accuracy = accuracy_score(y, y_pred)
-                    precision = precision_score(y, y_pred, average='weighted')
-                    recall = recall_score(y, y_pred, average='weighted')
-                    f1 = f1_score(y, y_pred, average='weighted')
+                    # Evaluate model on the held-out rows
+                    y_pred = model.predict(X_val)
+                    accuracy = accuracy_score(y_val, y_pred)
+                    precision = precision_score(y_val, y_pred, average='weighted', zero_division=0)
+                    recall = recall_score(y_val, y_pred, average='weighted', zero_division=0)
+                    f1 = f1_score(y_val, y_pred, average='weighted', zero_division=0)
                     
                     # Update performance
                     self.model_performance[model_name] = {
@@ -624,20 +817,10 @@ class EnhancedAnomalyDetector:
                     self.logger.info(f"Model {model_name} retrained - Accuracy: {accuracy:.3f}")
                     
                 except Exception as e:
-                    self.logger.error(f"Failed to retrain {model_name}: {e}")
+                    self.logger.error(f"Failed to evaluate {model_name}: {e}")
             
-            # Retrain unsupervised models
-            for model_name in ['isolation_forest', 'dbscan', 'kmeans']:
-                try:
-                    model = self.models[model_name]
-                    model.fit(X_scaled)
-                    self.logger.info(f"Model {model_name} retrained")
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to retrain {model_name}: {e}")
-            
-            # Update baseline features
-            self._update_baseline_features(X)
+            # Learn ensemble weights on the held-out split
+            self._optimize_model_weights(X_val, y_val)
             
             # Save models
             self._save_models()
@@ -646,23 +829,127 @@ class EnhancedAnomalyDetector:
             
         except Exception as e:
             self.logger.error(f"Model retraining failed: {e}")
+        
+        finally:
+            self._publish_status()
+    
+    def _prepare_warm_start(self, y: np.ndarray):
+        """Let the warm-started models continue from their previous fit"""
+        classes = np.unique(y)
+        for model_name in self._WARM_START_MODELS:
+            model = self.models[model_name]
+            model.set_params(warm_start=True)
+            if not hasattr(model, 'classes_'):
+                continue
+            
+            if not np.array_equal(model.classes_, classes):
+                # Warm start needs the same classes; start over from scratch
+                self._register_model(model_name, clone(model))
+                self._fitted[model_name] = False
+            elif model_name == 'random_forest':
+                model.estimators_ = model.estimators_[self._RF_WARM_START_TREES:]
     
-    def _is_anomaly_at_time(self, timestamp: datetime) -> bool:
-        """Check if there was an anomaly at a specific time"""
+    def _model_anomaly_probabilities(self, X_scaled: np.ndarray) -> np.ndarray:
+        """Anomaly probability of each model (columns in self.models order) per sample"""
+        F = np.zeros((len(X_scaled), len(self.models)))
+        for j, (model_name, model) in enumerate(self.models.items()):
+            if not self._fitted.get(model_name, False):
+                continue
+            predictions, scores = self._model_predictions(model_name, model, X_scaled)
+            F[:, j] = self._anomaly_probability(model_name, model, predictions, scores)
+        return F
+    
+    def _optimize_model_weights(self, X_val: np.ndarray, y_val: np.ndarray):
+        """Fit ensemble weights (sum 1, each >= 0.01) against labels of rows held out of training"""
         try:
-            time_window = timedelta(minutes=5)
+            if len(np.unique(y_val)) < 2:
+                self.logger.info("Validation split has a single class, keeping model weights")
+                return
             
-            for anomaly_entry in self.anomaly_history:
-                anomaly_time = datetime.fromisoformat(anomaly_entry["timestamp"])
-                
-                if abs((timestamp - anomaly_time).total_seconds()) < time_window.total_seconds():
-                    return anomaly_entry["is_anomaly"]
+            F = self._model_anomaly_probabilities(X_val)
+            n_models = F.shape[1]
+            
+            # Smooth (Brier) loss so SLSQP gets a usable gradient; F1 is piecewise constant
+            def loss(w):
+                return np.mean((F @ w - y_val) ** 2) + 1e-3 * np.dot(w, w)
+            
+            result = minimize(
+                loss,
+                x0=np.ones(n_models) / n_models,
+                method='SLSQP',
+                bounds=[(0.01, 1.0)] * n_models,
+                constraints={'type': 'eq', 'fun': lambda w: w.sum() - 1}
+            )
+            if not result.success:
+                self.logger.warning(f"Model weight optimization did not converge: {result.message}")
+                return
             
-            return False
+            self.model_weights = {
+                model_name: float(w) for model_name, w in zip(self.models.keys(), result.x)
+            }
+            f1 = f1_score(y_val, (F @ result.x > 0.5).astype(int), zero_division=0)
+            self.logger.info(f"Model weights optimized - Validation F1: {f1:.3f}")
             
         except Exception as e:
-            self.logger.error(f"Anomaly time check failed: {e}")
-            return False
+            self.logger.error(f"Model weight optimization failed: {e}")
+    
+    def _register_model(self, model_name: str, model: Any):
+        """Add or replace a model, keeping the count of fittable models current"""
+        previous = self.models.get(model_name)
+        if previous is not None and hasattr(previous, 'fit'):
+            self._fittable_models_count -= 1
+        if hasattr(model, 'fit'):
+            self._fittable_models_count += 1
+        self.models[model_name] = model
+    
+    def _refresh_fitted(self):
+        """Record which models look fitted (the bundle stores this; legacy files do not)"""
+        for model_name, model in self.models.items():
+            try:
+                check_is_fitted(model)
+                self._fitted[model_name] = True
+            except NotFittedError:
+                self._fitted[model_name] = False
+    
+    def _cache_scaler(self):
+        """Cache the fitted standard scaler statistics for inference"""
+        scaler = self.scalers.get('standard')
+        if scaler is not None and hasattr(scaler, 'mean_'):
+            self._scaler_mean = scaler.mean_.astype(np.float32)
+            self._scaler_scale = scaler.scale_.astype(np.float32)
+    
+    def _cache_dbscan(self):
+        """Cache the DBSCAN core samples and eps used for online scoring"""
+        model = self.models.get('dbscan')
+        if model is not None and hasattr(model, 'components_'):
+            self._dbscan_core = model.components_
+            self._dbscan_eps = model.eps
+    
+    def _cache_kmeans(self):
+        """Cache the KMeans cluster centers used for online scoring"""
+        model = self.models.get('kmeans')
+        if model is not None and hasattr(model, 'cluster_centers_'):
+            self._km_centers = model.cluster_centers_.astype(np.float32)
+    
+    def _history_size(self) -> int:
+        """Number of feature rows currently held in the history buffers"""
+        return self._HISTORY_SIZE if self._buf_full else self._buf_cursor
+    
+    def _anomaly_labels(self, timestamps: np.ndarray) -> np.ndarray:
+        """Label each epoch timestamp 1 if an anomaly was detected within the label window"""
+        with self.detector_lock:
+            anomaly_times = np.array(self._anomaly_times, dtype=np.float64)
+            anomaly_flags = np.array(self._anomaly_flags, dtype=np.int64)
+        
+        order = np.argsort(anomaly_times, kind='stable')
+        anomaly_times = anomaly_times[order]
+        
+        # Anomalies strictly inside (t - window, t + window), counted via a prefix sum
+        lo = np.searchsorted(anomaly_times, timestamps - self._LABEL_WINDOW, side='right')
+        hi = np.searchsorted(anomaly_times, timestamps + self._LABEL_WINDOW, side='left')
+        counts = np.concatenate(([0], np.cumsum(anomaly_flags[order])))
+        
+        return (counts[hi] > counts[lo]).astype(int)
     
     def _update_baseline_features(self, X: np.ndarray):
         """Update baseline feature statistics"""
@@ -679,29 +966,43 @@ class EnhancedAnomalyDetector:
                         "median": np.median(feature_values)
                     }
             
+            self._cache_baseline()
+            
         except Exception as e:
             self.logger.error(f"Baseline update failed: {e}")
     
+    def _cache_baseline(self):
+        """Cache baseline mean/std as arrays for normalization"""
+        mean = np.zeros(len(self.feature_names), dtype=np.float32)
+        std = np.ones(len(self.feature_names), dtype=np.float32)
+        valid = np.ones(len(self.feature_names), dtype=np.bool_)
+        for i, feature_name in enumerate(self.feature_names):
+            baseline_stats = self.baseline_features.get(feature_name, {})
+            if baseline_stats.get("std", 1) > 0:
+                mean[i] = baseline_stats.get("mean", 0)
+                std[i] = baseline_stats.get("std", 1)
+            else:
+                valid[i] = False
+        self._baseline_mean = mean
+        self._baseline_std = std
+        self._baseline_valid = valid
+    
     def _save_models(self):
-        """Save trained models"""
+        """Save trained models, scalers, baseline, weights and performance as one bundle"""
         try:
-            for model_name, model in self.models.items():
-                model_path = os.path.join(self.model_dir, f"{model_name}.pkl")
-                joblib.dump(model, model_path)
-            
-            # Save scalers
-            scaler_path = os.path.join(self.model_dir, "scalers.pkl")
-            joblib.dump(self.scalers, scaler_path)
-            
-            # Save baseline features
-            baseline_path = os.path.join(self.model_dir, "baseline_features.json")
-            with open(baseline_path, 'w') as f:
-                json.dump(self.baseline_features, f, indent=2)
+            bundle = {
+                'models': self.models,
+                'fitted': self._fitted,
+                'scalers': self.scalers,
+                'baseline': self.baseline_features,
+                'weights': self.model_weights,
+                'perf': self.model_performance
+            }
             
-            # Save model performance
-            performance_path = os.path.join(self.model_dir, "model_performance.json")
-            with open(performance_path, 'w') as f:
-                json.dump(self.model_performance, f, indent=2)
+            # Write through a temporary file so a concurrent load never sees a partial bundle
+            bundle_path = os.path.join(self.model_dir, self._BUNDLE_FILE)
+            joblib.dump(bundle, f"{bundle_path}.tmp", compress=self._BUNDLE_COMPRESS)
+            os.replace(f"{bundle_path}.tmp", bundle_path)
             
         except Exception as e:
             self.logger.error(f"Model saving failed: {e}")
@@ -709,57 +1010,114 @@ class EnhancedAnomalyDetector:
     def _load_models(self):
         """Load existing models"""
         try:
-            # Load models
-            for model_name in self.models.keys():
-                model_path = os.path.join(self.model_dir, f"{model_name}.pkl")
-                if os.path.exists(model_path):
-                    self.models[model_name] = joblib.load(model_path)
-            
-            # Load scalers
-            scaler_path = os.path.join(self.model_dir, "scalers.pkl")
-            if os.path.exists(scaler_path):
-                self.scalers = joblib.load(scaler_path)
-            
-            # Load baseline features
-            baseline_path = os.path.join(self.model_dir, "baseline_features.json")
-            if os.path.exists(baseline_path):
-                with open(baseline_path, 'r') as f:
-                    self.baseline_features = json.load(f)
-            
-            # Load model performance
-            performance_path = os.path.join(self.model_dir, "model_performance.json")
-            if os.path.exists(performance_path):
-                with open(performance_path, 'r') as f:
-                    self.model_performance = json.load(f)
+            bundle_path = os.path.join(self.model_dir, self._BUNDLE_FILE)
+            if os.path.exists(bundle_path):
+                bundle = joblib.load(bundle_path)
+                for model_name, model in bundle['models'].items():
+                    self._register_model(model_name, model)
+                self._fitted.update(bundle['fitted'])
+                self.scalers = bundle['scalers']
+                self.baseline_features = bundle['baseline']
+                self.model_weights.update(bundle['weights'])
+                self.model_performance = bundle['perf']
+            else:
+                self._load_legacy_models()
+                self._refresh_fitted()
+            
+            self._cache_dbscan()
+            self._cache_kmeans()
+            self._cache_scaler()
+            self._cache_baseline()
             
             self.logger.info("Models loaded successfully")
             
         except Exception as e:
             self.logger.error(f"Model loading failed: {e}")
     
+    def _load_legacy_models(self):
+        """Load models saved as separate per-model pickle and JSON files"""
+        # Load models
+        for model_name in self.models.keys():
+            model_path = os.path.join(self.model_dir, f"{model_name}.pkl")
+            if os.path.exists(model_path):
+                self._register_model(model_name, joblib.load(model_path))
+        
+        # Load scalers
+        scaler_path = os.path.join(self.model_dir, "scalers.pkl")
+        if os.path.exists(scaler_path):
+            self.scalers = joblib.load(scaler_path)
+        
+        # Load baseline features
+        baseline_path = os.path.join(self.model_dir, "baseline_features.json")
+        if os.path.exists(baseline_path):
+            with open(baseline_path, 'r') as f:
+                self.baseline_features = json.load(f)
+        
+        # Load model performance
+        performance_path = os.path.join(self.model_dir, "model_performance.json")
+        if os.path.exists(performance_path):
+            with open(performance_path, 'r') as f:
+                self.model_performance = json.load(f)
+    
+    def _publish_status(self):
+        """Rebuild the status snapshot after models, baseline or retrain time change"""
+        with self.detector_lock:
+            self._status_snapshot = {
+                "models_loaded": self._fittable_models_count,
+                "baseline_established": bool(self.baseline_features),
+                "model_performance": {name: dict(perf) for name, perf in self.model_performance.items()},
+                "last_retrain": self.last_retrain,
+                "feature_names": list(self.feature_names)
+            }
+            self._state_version += 1
+    
     def get_detector_status(self) -> Dict[str, Any]:
-        """Get anomaly detector status"""
+        """Get anomaly detector status (lock-free: published snapshot plus live counters)"""
         try:
-            with self.detector_lock:
-                return {
-                    "models_loaded": len([m for m in self.models.values() if hasattr(m, 'fit')]),
-                    "feature_history_size": len(self.feature_history),
-                    "anomaly_history_size": len(self.anomaly_history),
-                    "baseline_established": bool(self.baseline_features),
-                    "model_performance": self.model_performance,
-                    "last_retrain": self.last_retrain,
-                    "feature_names": self.feature_names
-                }
+            # Version read first: a change during the rebuild leaves the cache stale-tagged
+            version = self._state_version
+            cached_version, cached_status = self._cached_status
+            if cached_version == version:
+                return self._copy_status(cached_status)
+            
+            snapshot = self._status_snapshot
+            detections = self._detections
+            status = {
+                **snapshot,
+                "feature_history_size": self._history_size(),
+                "anomaly_history_size": len(self.anomaly_history),
+                "fast_path_rate": self._fast_path_hits / detections if detections else 0.0
+            }
+            self._cached_status = (version, status)
+            
+            return self._copy_status(status)
                 
         except Exception as e:
             self.logger.error(f"Failed to get detector status: {e}")
             return {"error": str(e)}
     
-    def get_anomaly_history(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get anomaly detection history"""
+    @staticmethod
+    def _copy_status(status: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a memoized status, down to the nested containers callers might mutate"""
+        return {
+            **status,
+            "model_performance": {name: dict(perf) for name, perf in status["model_performance"].items()},
+            "feature_names": list(status["feature_names"])
+        }
+    
+    def get_anomaly_history(self, limit: int = 100, iso_timestamps: bool = False) -> List[Dict[str, Any]]:
+        """Get anomaly detection history (timestamps are epoch seconds unless iso_timestamps)"""
         try:
             with self.detector_lock:
-                return list(self.anomaly_history)[-limit:] if self.anomaly_history else []
+                history = list(self.anomaly_history)[-limit:] if self.anomaly_history else []
+            
+            if iso_timestamps:
+                history = [
+                    {**entry, "timestamp": datetime.fromtimestamp(entry["timestamp"]).isoformat()}
+                    for entry in history
+                ]
+            
+            return history
         except Exception as e:
             self.logger.error(f"Failed to get anomaly history: {e}")
             return []
@@ -0,0 +1,66 @@
+"""
+Kernel skor numerik untuk AnomalyDetector
+Ditulis sebagai Python biasa agar bisa di-JIT (numba.njit) saat runtime
+maupun dikompilasi AOT oleh build_kernels.py menjadi modul anomaly_kernels
+"""
+
+import numpy as np
+
+# Signature ekspor AOT per kernel (lihat build_kernels.py)
+AOT_SIGNATURES = {
+    'score_kernel': 'Tuple((float64, float64, int64))(float32[:], float32[:, :], float64)',
+    'iforest_depths': 'float64[:](float32[:, :], int64[:], float64[:], int64[:], int64[:], float64[:], int64[:])',
+}
+
+
+def iforest_depths(X, feature, threshold, children_left, children_right, leaf_depth, tree_offsets):
+    """
+    Total kedalaman daun (termasuk koreksi c(n)) tiap sampel atas semua pohon
+    Indeks anak bersifat global pada array gabungan; daun ditandai children_left == -1
+    """
+    depths = np.zeros(X.shape[0])
+    for i in range(X.shape[0]):
+        for t in range(tree_offsets.shape[0] - 1):
+            node = tree_offsets[t]
+            while children_left[node] != -1:
+                if X[i, feature[node]] <= threshold[node]:
+                    node = children_left[node]
+                else:
+                    node = children_right[node]
+            depths[i] += leaf_depth[node]
+    return depths
+
+
+def score_kernel(features_scaled, centers, if_score):
+    """
+    Skor gabungan Isolation Forest + K-Means dalam satu pass atas center cluster
+    Mengembalikan (combined_score, distance_to_center, cluster); cluster adalah
+    center terdekat, sama seperti KMeans.predict
+    """
+    cluster = 0
+    distance_to_center = np.inf
+    max_distance = 0.0
+    for i in range(centers.shape[0]):
+        s = 0.0
+        for j in range(features_scaled.shape[0]):
+            diff = features_scaled[j] - centers[i, j]
+            s += diff * diff
+        distance = np.sqrt(s)
+        if distance > max_distance:
+            max_distance = distance
+        if distance < distance_to_center:
+            distance_to_center = distance
+            cluster = i
+    
+    # Konversi if_score (semakin negatif = semakin anomali), normalisasi ke 0-100
+    if_normalized = max(0.0, (if_score + 0.5) * 100)
+    
+    # Jarak dari cluster center (semakin jauh = semakin anomali)
+    if max_distance > 0:
+        distance_normalized = (distance_to_center / max_distance) * 100
+    else:
+        distance_normalized = 0.0
+    
+    # Skor gabungan (rata-rata tertimbang)
+    combined_score = (if_normalized * 0.7) + (distance_normalized * 0.3)
+    return combined_score, distance_to_center, cluster
@@ -0,0 +1,61 @@
+"""
+Tests for AdvancedSelfLearningSystem
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from src.learning import advanced_self_learning
+from src.learning.advanced_self_learning import AdvancedSelfLearningSystem
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def learning_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logs").mkdir()
+    return tmp_path / "learning_data"
+
+
+def _attack(cpu):
+    return {"threat_level": "HIGH", "host_metrics": {"system": {"cpu": {"percent": cpu}}}}
+
+
+def test_close_writes_complete_signature_files(learning_path, monkeypatch):
+    monkeypatch.setattr(advanced_self_learning, "_PARQUET_FILE_BATCHES", 2)
+    first = AdvancedSelfLearningSystem(f"{learning_path}/")
+    second = AdvancedSelfLearningSystem(f"{learning_path}/")
+    for cpu in range(300):
+        first.learn_from_attack(_attack(cpu))
+    second.learn_from_attack(_attack(50))
+    first.close()
+    second.close()
+
+    files = sorted((learning_path / "signatures").iterdir())
+    assert all(path.suffix == ".parquet" for path in files)
+    # 300 rows: five row groups, rolled every two; plus one file for second
+    assert len(files) == 4
+    assert sum(pq.read_metadata(path).num_rows for path in files) == 301
+
+
+def test_pending_signatures_are_written_at_exit(learning_path):
+    script = (
+        "from src.learning.advanced_self_learning import AdvancedSelfLearningSystem\n"
+        f"system = AdvancedSelfLearningSystem({str(learning_path)!r} + '/')\n"
+        "for cpu in range(5):\n"
+        "    system.learn_from_attack({'threat_level': 'HIGH', "
+        "'host_metrics': {'system': {'cpu': {'percent': cpu}}}})\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True,
+                   env={**os.environ, "PYTHONPATH": str(REPO_ROOT)})
+
+    files = list((learning_path / "signatures").iterdir())
+    assert [path.suffix for path in files] == [".parquet"]
+    assert pq.read_metadata(files[0]).num_rows == 5
@@ -0,0 +1,63 @@
+"""
+Tests for AnomalyDetector
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.ml_models.anomaly_detector import AnomalyDetector
+
+
+def _sample(cpu, memory, processes):
+    host = {
+        "system": {"cpu": {"percent": cpu}, "memory": {"percent": memory}, "disk": {"percent": 40.0}},
+        "processes": [{"cpu_percent": 1.0, "memory_percent": 0.5}] * processes,
+    }
+    return host, {"features": {"total_events": 10}}
+
+
+@pytest.fixture
+def trained_detector(tmp_path, monkeypatch):
+    """Detector trained on normal samples (cpu ~ 30, memory ~ 50)"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logs").mkdir()
+    rng = np.random.default_rng(0)
+    detector = AnomalyDetector(model_path=str(tmp_path / "models"), n_jobs=1)
+    training_data = [
+        dict(zip(("host_metrics", "network_metrics"),
+                 _sample(float(rng.normal(30, 5)), float(rng.normal(50, 5)), int(rng.integers(80, 120)))))
+        for _ in range(100)
+    ]
+    assert detector.train_baseline_model(training_data)
+    return detector
+
+
+def test_prepare_features_returns_a_fresh_array(trained_detector):
+    first = trained_detector.prepare_features(*_sample(10.0, 20.0, 5))
+    second = trained_detector.prepare_features(*_sample(90.0, 95.0, 300))
+
+    assert first is not second
+    assert first[0] == pytest.approx(10.0)
+    assert second[0] == pytest.approx(90.0)
+
+
+def test_batch_result_is_json_serializable(trained_detector):
+    results = trained_detector.detect_anomaly_batch([_sample(30.0, 50.0, 100), _sample(99.0, 99.0, 400)])
+
+    for result in results:
+        assert json.loads(json.dumps(result)) == result
+
+
+def test_load_models_restores_estimators(trained_detector):
+    loaded = AnomalyDetector(model_path=trained_detector.model_path, n_jobs=1)
+    assert loaded.load_models()
+
+    X = np.stack([trained_detector.prepare_features(*_sample(30.0, 50.0, 100)),
+                  trained_detector.prepare_features(*_sample(99.0, 99.0, 400))])
+    X_scaled = loaded.scaler.transform(X)
+    assert np.array_equal(X_scaled, trained_detector.scaler.transform(X))
+    assert np.array_equal(loaded.isolation_forest.decision_function(X_scaled),
+                          trained_detector.isolation_forest.decision_function(X_scaled))
+    assert np.array_equal(loaded.kmeans.predict(X_scaled), trained_detector.kmeans.predict(X_scaled))
@@ -0,0 +1,92 @@
+"""
+Tests for EnhancedAnomalyDetector
+"""
+
+import numpy as np
+import pytest
+
+from src.ml_models.enhanced_anomaly_detector import EnhancedAnomalyDetector
+
+
+def _event(cpu, memory, processes, packets, connections):
+    host = {"cpu_usage": cpu, "memory_usage": memory, "disk_usage": 50.0, "process_count": processes}
+    network = {"packets_per_second": packets, "connections": connections}
+    return host, network
+
+
+@pytest.fixture
+def trained_detector(tmp_path, monkeypatch):
+    """Detector retrained on normal traffic (cpu ~ 50, memory ~ 60, ...)"""
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(0)
+    detector = EnhancedAnomalyDetector(None)
+    events = [
+        _event(float(rng.normal(50, 5)), float(rng.normal(60, 3)), int(rng.integers(90, 110)),
+               float(rng.normal(1000, 50)), int(rng.integers(10, 30)))
+        for _ in range(300)
+    ]
+    # The first detection call retrains (last_retrain starts at 0)
+    detector.detect_enhanced_anomaly_batch(events)
+    assert detector.baseline_features["cpu_usage"]["mean"] == pytest.approx(50, abs=1)
+    return detector
+
+
+def test_baseline_input_takes_fast_path(trained_detector):
+    # Repeat the baseline values so the trend features settle at 0
+    for _ in range(10):
+        result = trained_detector.detect_enhanced_anomaly(*_event(50.0, 60.0, 100, 1000.0, 20))
+
+    assert result["is_anomaly"] is False
+    assert result["model_predictions"] == {}
+    assert result["pattern_analysis"]["feature_anomalies"] == []
+    assert trained_detector.get_detector_status()["fast_path_rate"] > 0
+
+
+def test_extreme_input_runs_ensemble(trained_detector):
+    result = trained_detector.detect_enhanced_anomaly(*_event(500.0, 60.0, 100, 1000.0, 20))
+
+    assert set(result["model_predictions"]) == set(trained_detector.models)
+    assert result["pattern_analysis"]["feature_anomalies"][0]["feature"] == "cpu_usage"
+
+
+def test_baseline_survives_second_retrain(trained_detector):
+    # Traffic seen after the first baseline must not be normalized twice
+    rng = np.random.default_rng(1)
+    trained_detector.detect_enhanced_anomaly_batch([
+        _event(float(rng.normal(50, 5)), float(rng.normal(60, 3)), int(rng.integers(90, 110)),
+               float(rng.normal(1000, 50)), int(rng.integers(10, 30)))
+        for _ in range(300)
+    ])
+    trained_detector._retrain_models()
+
+    assert trained_detector.baseline_features["cpu_usage"]["mean"] == pytest.approx(50, abs=1)
+
+
+def test_ensemble_score_follows_model_weights(trained_detector):
+    event = _event(500.0, 60.0, 100, 1000.0, 20)
+
+    # Far from every training point: dbscan flags it, kmeans (all centers
+    # about equally far) does not
+    trained_detector.model_weights = {name: 0.0 for name in trained_detector.models}
+    trained_detector.model_weights["dbscan"] = 1.0
+    result = trained_detector.detect_enhanced_anomaly(event[0], event[1])
+    assert result["anomaly_score"] == pytest.approx(1.0)
+    assert result["is_anomaly"] is True
+
+    trained_detector.model_weights["dbscan"] = 0.0
+    trained_detector.model_weights["kmeans"] = 1.0
+    result = trained_detector.detect_enhanced_anomaly(event[0], event[1])
+    assert result["anomaly_score"] == pytest.approx(0.0)
+    assert result["is_anomaly"] is False
+
+
+def test_detector_status_is_a_copy(trained_detector):
+    status = trained_detector.get_detector_status()
+    status["models_loaded"] = -1
+    status["model_performance"]["kmeans"]["x"] = 1
+    status["feature_names"].append("x")
+
+    status = trained_detector.get_detector_status()
+    assert status["models_loaded"] != -1
+    assert "x" not in status["model_performance"]["kmeans"]
+    assert "x" not in status["feature_names"]
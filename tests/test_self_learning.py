@@ -0,0 +1,66 @@
+"""
+Tests for SelfLearningSystem
+"""
+
+import gc
+import json
+
+import numpy as np
+import pytest
+
+from src.learning.self_learning import SelfLearningSystem
+
+ATTACK = {
+    "threat_level": "HIGH",
+    "host_metrics": {
+        "system": {"cpu": {"percent": 95}},
+        "critical_files": {"/etc/passwd": {"exists": True, "modified": True}},
+    },
+    "network_metrics": {"anomaly_score": 1, "foreign_ips": ["203.0.113.7"]},
+}
+
+
+@pytest.fixture
+def learning_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logs").mkdir()
+    return tmp_path / "learning_data"
+
+
+def test_close_writes_wal_and_final_feature_importance(learning_path):
+    system = SelfLearningSystem(f"{learning_path}/")
+    for _ in range(60):
+        assert system.learn_from_attack(ATTACK)
+    system.close()
+
+    for wal in ("patterns.jsonl", "signatures.jsonl"):
+        assert len((learning_path / wal).read_text().splitlines()) == 60
+    importance = json.loads((learning_path / "feature_importance.json").read_text())
+    assert importance == system.feature_importance
+
+
+def test_collected_system_flushes_its_writer(learning_path):
+    system = SelfLearningSystem(f"{learning_path}/")
+    system.learn_from_attack(ATTACK)
+    writer_thread = system._writer._thread
+
+    del system
+    gc.collect()
+
+    assert not writer_thread.is_alive()
+    assert len((learning_path / "signatures.jsonl").read_text().splitlines()) == 1
+
+
+def test_load_attack_data_restores_arrays(learning_path):
+    system = SelfLearningSystem(f"{learning_path}/")
+    samples = np.arange(12, dtype=np.float32).reshape(3, 4)
+    system.learn_from_attack({**ATTACK, "samples": samples})
+    system.learn_from_attack(ATTACK)
+    system.close()
+
+    first, second = system.load_attack_data()
+    assert first["samples"].dtype == samples.dtype
+    assert np.array_equal(first["samples"], samples)
+    assert first["host_metrics"] == ATTACK["host_metrics"]
+    assert "samples" not in second
+    assert system.load_attack_data(limit=1) == [second]